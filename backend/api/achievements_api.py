@@ -32,24 +32,24 @@ def grant_achievement(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def list_recent_achievements(uid: str, limit: int = 4) -> list[dict]:
+    achievements_query = db.collection('users').document(uid).collection('achievements') \
+        .order_by("achieved_at", direction=firestore.Query.DESCENDING) \
+        .limit(limit)
+        
+    achievements = []
+    for doc in achievements_query.stream():
+        doc_data = doc.to_dict()
+        doc_data['id'] = doc.id
+        achievements.append(doc_data)
+    return achievements
+
 @router.get("/recentAchievements", response_model=list[Achievement])
 def get_recent_achievements(current_user: dict = Depends(get_current_user)):
     uid = current_user.get("uid")
     
     try:
-        achievements_query = db.collection('users').document(uid).collection('achievements') \
-            .order_by("achieved_at", direction=firestore.Query.DESCENDING) \
-            .limit(4)
-            
-        docs = achievements_query.stream()
-        
-        achievements = []
-        for doc in docs:
-            doc_data = doc.to_dict()
-            doc_data['id'] = doc.id
-            achievements.append(doc_data)
-            
-        return achievements
+        return list_recent_achievements(uid)
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
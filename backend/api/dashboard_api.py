@@ -0,0 +1,64 @@
+from fastapi import APIRouter, HTTPException, Depends, status
+from schemas.dashboard import Dashboard
+from core.security import get_current_user
+from api.achievements_api import list_recent_achievements
+from api.quiz_api import get_active_quiz_summaries
+from services.incident_queries import count_user_incidents
+from services.user_profiles import get_user_profile_async
+import asyncio
+import time
+
+router = APIRouter()
+
+async def _timed(coro, timings: dict, name: str):
+    start = time.perf_counter()
+    try:
+        return await coro
+    finally:
+        timings[name] = round((time.perf_counter() - start) * 1000, 1)
+
+@router.get("", response_model=Dashboard)
+async def get_dashboard(current_user: dict = Depends(get_current_user)):
+    """
+    Everything the dashboard page shows, in one response. The sections are fetched
+    concurrently, so this takes about as long as the slowest one.
+    """
+    uid = current_user.get("uid")
+    timings = {}
+
+    sections = {
+        "profile": get_user_profile_async(uid),
+        "recent_achievements": asyncio.to_thread(list_recent_achievements, uid),
+        "active_quizzes": asyncio.to_thread(get_active_quiz_summaries, uid),
+        "incident_stats": count_user_incidents(uid),
+    }
+    results = await asyncio.gather(
+        *(_timed(coro, timings, name) for name, coro in sections.items()),
+        return_exceptions=True
+    )
+    data = dict(zip(sections, results))
+
+    # the profile is required; any other section can fail on its own
+    if isinstance(data["profile"], Exception):
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An error occurred while fetching user data: {str(data['profile'])}"
+        )
+    if data["profile"] is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User profile not found")
+
+    errors = {}
+    for name, result in data.items():
+        if isinstance(result, Exception):
+            print(f"Dashboard section {name} failed: {result}")
+            errors[name] = str(result)
+            data[name] = None
+
+    return Dashboard(
+        profile=data["profile"],
+        recent_achievements=data["recent_achievements"] or [],
+        active_quizzes=data["active_quizzes"] or [],
+        incident_stats=data["incident_stats"],
+        timings_ms=timings,
+        errors=errors
+    )
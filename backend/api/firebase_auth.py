@@ -2,19 +2,25 @@ from fastapi import APIRouter, HTTPException, status, Depends
 from schemas.user import UserCreate, UserLogin
 from core.firebase_setup import firebase_auth, db
 from firebase_admin import auth, exceptions
-import requests
+import asyncio
+import httpx
 import os
 from dotenv import load_dotenv
 from pydantic import BaseModel
 from core.security import create_access_token
+from core.http_client import get_http_client
 
 load_dotenv()
 
 router = APIRouter()
 
 FIREBASE_WEB_API_KEY = os.getenv("FIREBASE_WEB_API_KEY")
-# Firebase Auth endpoint
-rest_api_url = f"https://identitytoolkit.googleapis.com/v1/accounts:signInWithPassword?key={FIREBASE_WEB_API_KEY}"
+# Firebase Auth endpoint; the base URL can point at a local stub server
+IDENTITY_TOOLKIT_URL = os.getenv("IDENTITY_TOOLKIT_URL", "https://identitytoolkit.googleapis.com")
+rest_api_url = f"{IDENTITY_TOOLKIT_URL}/v1/accounts:signInWithPassword"
+# sign-in calls in flight at once; a login burst waits here instead of taking every pooled connection
+SIGN_IN_MAX_CONCURRENCY = int(os.getenv("SIGN_IN_MAX_CONCURRENCY", 20))
+_sign_in_slots = asyncio.Semaphore(SIGN_IN_MAX_CONCURRENCY)
 
 
 @router.post("/signup", status_code=status.HTTP_201_CREATED)
@@ -60,7 +66,7 @@ def create_user(user_data: UserCreate):
 
 
 @router.post("/login")
-def login_user(user_data: UserLogin):
+async def login_user(user_data: UserLogin, http_client: httpx.AsyncClient = Depends(get_http_client)):
     try:
         payload = {
             "email": user_data.email,
@@ -68,7 +74,8 @@ def login_user(user_data: UserLogin):
             "returnSecureToken": True
         }
         
-        response = requests.post(rest_api_url, json=payload)
+        async with _sign_in_slots:
+            response = await http_client.post(rest_api_url, params={"key": FIREBASE_WEB_API_KEY}, json=payload)
         response_data = response.json()
         
         if response.status_code != 200:
@@ -86,7 +93,8 @@ def login_user(user_data: UserLogin):
         
         return {"token_type": "bearer", "access_token": app_access_token}
 
-    except requests.exceptions.RequestException as e:
+    # ValueError: a body that isn't JSON, e.g. a proxy's 502 page
+    except (httpx.HTTPError, ValueError) as e:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail=f"Could not connect to Firebase Auth API: {str(e)}"
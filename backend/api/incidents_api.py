@@ -1,12 +1,23 @@
-from fastapi import APIRouter, HTTPException, Depends, status
-from schemas.incident import Incident, IncidentCreate, IncidentUpdate, IncidentQuizSubmission
-from core.firebase_setup import db
+from fastapi import APIRouter, HTTPException, Depends, Query, status
+from fastapi.responses import HTMLResponse
+from schemas.incident import (
+    Incident, IncidentCreate, IncidentUpdate, IncidentQuizSubmission, SimulationVariant,
+    IncidentSummary, IncidentPage, IncidentView, IncidentFilters, IncidentStats
+)
+from core.firebase_setup import db, async_db
 from core.security import get_current_user
+from services.driving_service import regenerate_failed_simulations
+from services.simulation_store import with_simulations, externalize_simulations
+from services.incident_queries import list_user_incidents, count_user_incidents, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from datetime import datetime
+import asyncio
+from typing import Optional
 from uuid import UUID
 
 router = APIRouter()
 
 incidents_collection = db.collection('incidents')
+async_incidents_collection = async_db.collection('incidents')
 
 @router.post("/create", response_model=Incident)
 def create_incident(
@@ -22,18 +33,40 @@ def create_incident(
     
     data_to_store['incident_id'] = str(data_to_store['incident_id'])
     data_to_store['created_at'] = data_to_store['created_at'].isoformat()
+    externalize_simulations(data_to_store)
     
     incidents_collection.document(data_to_store['incident_id']).set(data_to_store)
     
     return new_incident
 
-@router.get("/getAll", response_model=list[Incident])
-def get_user_incidents(current_user: dict = Depends(get_current_user)):
+@router.get("/getAll", response_model=IncidentPage)
+async def get_user_incidents(
+    page_size: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    start_after: Optional[str] = None,
+    view: IncidentView = IncidentView.FULL,
+    filters: IncidentFilters = Depends(),
+    current_user: dict = Depends(get_current_user)
+):
     uid = current_user.get("uid")
-    
-    incidents_query = incidents_collection.where('user_id', '==', uid).stream()
-    
-    return [Incident.model_validate(incident.to_dict()) for incident in incidents_query]
+
+    items, next_cursor = await list_user_incidents(
+        uid, page_size, start_after, summary=view == IncidentView.SUMMARY, filters=filters
+    )
+
+    model = IncidentSummary if view == IncidentView.SUMMARY else Incident
+    return IncidentPage(items=[model.model_validate(item) for item in items], next_cursor=next_cursor)
+
+@router.get("/stats", response_model=IncidentStats)
+async def get_incident_stats(
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Incident counts by severity and status, without reading the incidents themselves.
+    """
+    uid = current_user.get("uid")
+    return await count_user_incidents(uid, created_after, created_before)
 
 
 @router.patch("/update/{incident_id}", response_model=Incident)
@@ -61,7 +94,7 @@ def update_incident(
     incident_ref.update(update_data)
     
     updated_doc = incident_ref.get()
-    return Incident.model_validate(updated_doc.to_dict())
+    return Incident.model_validate(with_simulations(updated_doc.to_dict()))
 
 @router.delete("/delete/{incident_id}", status_code=status.HTTP_200_OK)
 def delete_incident(
@@ -113,7 +146,32 @@ def get_incident_by_id(
     if incident_data.get('user_id') != uid:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to view this incident")
 
-    return Incident.model_validate(incident_data)
+    return Incident.model_validate(with_simulations(incident_data))
+
+@router.get("/{incident_id}/simulation/{variant}", response_class=HTMLResponse)
+def get_incident_simulation(
+    incident_id: UUID,
+    variant: SimulationVariant,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Returns one simulation as a standalone page, e.g. for an iframe src.
+    """
+    uid = current_user.get("uid")
+    incident_doc = incidents_collection.document(str(incident_id)).get()
+    if not incident_doc.exists:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Incident not found")
+
+    incident_data = incident_doc.to_dict()
+    if incident_data.get('user_id') != uid:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to view this incident")
+
+    html_field = "simulation_html" if variant == SimulationVariant.ACTUAL else "simulation_better_html"
+    html = with_simulations(incident_data).get(html_field)
+    if not html:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Simulation not available")
+
+    return HTMLResponse(content=html)
 
 @router.post("/{incident_id}/quiz", response_model=dict)
 def submit_incident_quiz(
@@ -151,7 +209,8 @@ def submit_incident_quiz(
         # 5. Update the nested quiz object in Firestore using dot notation
         update_payload = {
             "quiz.user_selected_index": user_index,
-            "quiz.is_correct": is_correct
+            "quiz.is_correct": is_correct,
+            "quiz_answered": True
         }
         incident_ref.update(update_payload)
 
@@ -165,4 +224,35 @@ def submit_incident_quiz(
     except Exception as e:
         if isinstance(e, HTTPException):
             raise e
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/{incident_id}/simulations/retry", response_model=Incident)
+async def retry_incident_simulations(
+    incident_id: UUID,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Regenerates only the simulations that failed for this incident, leaving the analysis as is.
+    """
+    uid = current_user.get("uid")
+    incident_ref = async_incidents_collection.document(str(incident_id))
+
+    incident_doc = await incident_ref.get()
+    if not incident_doc.exists:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Incident not found")
+
+    incident_data = incident_doc.to_dict()
+
+    # Security Check: Ensure the incident belongs to the current user
+    if incident_data.get('user_id') != uid:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized for this incident")
+
+    if not incident_data.get('failed_simulations'):
+        return Incident.model_validate(await asyncio.to_thread(with_simulations, incident_data))
+
+    updates = await regenerate_failed_simulations(incident_data)
+    await incident_ref.update(updates)
+
+    # with_simulations downloads the html from Storage
+    return Incident.model_validate(await asyncio.to_thread(with_simulations, {**incident_data, **updates}))
@@ -1,13 +1,27 @@
-from fastapi import APIRouter, HTTPException, status, Depends, Body
-from schemas.quiz import QuizForUser, QuizSubmission, QuizResult, PastResult
+from fastapi import APIRouter, HTTPException, status, Depends, Body, BackgroundTasks, Query
+from schemas.quiz import (
+    QuizForUser, QuizSubmission, QuizResult, PastResult,
+    QuizHistoryView, QuizHistorySummary, QuizHistoryPage, QuizStats
+)
 from firebase_admin import firestore
-from services.gemini_service import generate_quiz_from_topic, generate_new_quiz_with_new_topic
+from services.gemini_service import generate_quiz_from_topic
+from services.quiz_pool import claim_quizzes, refill_quiz_pool
+from services.user_profiles import invalidate_user_profile
+from services.quiz_history import (
+    list_quiz_history, get_quiz_stats, quiz_stats_ref, add_completion_to_stats,
+    DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+)
 from core.firebase_setup import db
 from core.security import get_current_user
+from core.cache import TTLCache
 from datetime import date, datetime, timedelta
-from typing import List
+from dotenv import load_dotenv
+from typing import List, Optional
+import os
 import random
 
+load_dotenv()
+
 router = APIRouter()
 
 # List of topics for rotating quizzes
@@ -18,6 +32,18 @@ DEFAULT_TOPICS = [
     "Proper Braking"
 ]
 
+# The daily quiz changes once a day, so keep it in memory. update_daily_quiz refreshes this
+# process's copy; the TTL bounds how stale other worker processes can get.
+DAILY_QUIZ_CACHE_TTL_SEC = int(os.getenv("DAILY_QUIZ_CACHE_TTL_SEC", 300))
+daily_quiz_cache = TTLCache(ttl_sec=DAILY_QUIZ_CACHE_TTL_SEC)
+
+def _load_daily_quiz() -> dict | None:
+    daily_quiz_doc = db.collection('daily_quizzes').document('current_daily').get()
+    return daily_quiz_doc.to_dict() if daily_quiz_doc.exists else None
+
+def get_daily_quiz() -> dict | None:
+    return daily_quiz_cache.get_or_load('current_daily', _load_daily_quiz)
+
 # DEVELOPMENT PURPOSES
 @router.post("/generate", response_model=QuizForUser)
 def create_quiz(
@@ -47,85 +73,146 @@ def update_daily_quiz():
     quiz_data = generate_quiz_from_topic(daily_topic, random.choice(["Beginner", "Intermediate", "Advanced"]))
     if quiz_data:
         db.collection('daily_quizzes').document('current_daily').set(quiz_data)
+        daily_quiz_cache.set('current_daily', quiz_data)
         print("Daily quiz updated successfully")
 
+# Tops up the pre-generated quiz pool; run by the scheduler and after claims
+def refill_pool():
+    refill_quiz_pool(excluded_topics=DEFAULT_TOPICS)
+
+def seen_topics_ref(uid: str):
+    # every topic the user has completed, kept up to date by submit_quiz_transactional
+    return db.collection('users').document(uid).collection('quiz_meta').document('seen_topics')
+
+def _load_seen_topics(uid: str, seen_doc) -> set:
+    seen_data = seen_doc.to_dict() if seen_doc.exists else {}
+    topics = set(seen_data.get("topics", []))
+    if seen_data.get("backfilled"):
+        return topics
+
+    # users from before the seen-topics doc: fold in their history once
+    completions_ref = db.collection('users').document(uid).collection('quiz_completions')
+    history = {doc.to_dict().get("topic") for doc in completions_ref.select(["topic"]).stream()}
+    history.discard(None)
+    backfill = {"backfilled": True}
+    if history:
+        backfill["topics"] = firestore.ArrayUnion(sorted(history))
+    seen_topics_ref(uid).set(backfill, merge=True)
+    return topics.union(history)
+
+def _quiz_for_user(quiz_id: str, quiz_data: dict, completion_doc) -> dict:
+    completed = completion_doc is not None and completion_doc.exists
+    return {
+        "quiz_id": quiz_id,
+        "topic": quiz_data.get("topic"),
+        "questions": quiz_data.get("questions"),
+        "is_completed": completed,
+        "past_results": PastResult(**completion_doc.to_dict()) if completed else None
+    }
+
+def get_active_quiz_summaries(uid: str) -> list[dict]:
+    """
+    Topic and completion state of the user's daily and active quizzes, without the questions.
+    Read-only, unlike /quiz/active, which also tops up and cleans the active list.
+    """
+    today = date.today()
+    user_ref = db.collection('users').document(uid)
+    completions_ref = user_ref.collection('quiz_completions')
+    summaries = []
+
+    daily_quiz_id = f"daily_{today.isoformat()}"
+    daily_quiz_data = get_daily_quiz()
+    if daily_quiz_data:
+        summaries.append({"quiz_id": daily_quiz_id, "topic": daily_quiz_data.get("topic"), "is_daily": True})
+    for doc in user_ref.collection('active_quizzes').select(["topic"]).stream():
+        summaries.append({"quiz_id": doc.id, "topic": doc.to_dict().get("topic"), "is_daily": False})
+
+    if summaries:
+        completed = {doc.id for doc in db.get_all([completions_ref.document(s["quiz_id"]) for s in summaries]) if doc.exists}
+        for summary in summaries:
+            summary["is_completed"] = summary["quiz_id"] in completed
+    return summaries
+
 @router.get("/active", response_model=List[QuizForUser])
-def get_active_quizzes(current_user: dict = Depends(get_current_user)):
+def get_active_quizzes(background_tasks: BackgroundTasks, current_user: dict = Depends(get_current_user)):
     uid = current_user.get("uid")
     today = date.today()
     quizzes_to_return = []
-    
-    # Fetch daily quiz
-    daily_quiz_id = f"daily_{today.isoformat()}"
-    daily_completion_doc = db.collection('users').document(uid).collection('quiz_completions').document(daily_quiz_id).get()
-    daily_quiz_doc = db.collection('daily_quizzes').document('current_daily').get()
-    
-    if daily_quiz_doc.exists:
-        past_results_data = None
-        if daily_completion_doc.exists:
-            past_results_data = PastResult(**daily_completion_doc.to_dict())
-        
-        quizzes_to_return.append({
-            "quiz_id": daily_quiz_id,
-            "topic": daily_quiz_doc.to_dict()["topic"],
-            "questions": daily_quiz_doc.to_dict()["questions"],
-            "is_completed": daily_completion_doc.exists,
-            "past_results": past_results_data
-        })
 
-    # Clean Up, manage, and fetch persistent Quizzes
     TARGET_COUNT = 3
-    active_quizzes_ref = db.collection('users').document(uid).collection('active_quizzes')
-    completions_ref = db.collection('users').document(uid).collection('quiz_completions')
+    user_ref = db.collection('users').document(uid)
+    active_quizzes_ref = user_ref.collection('active_quizzes')
+    completions_ref = user_ref.collection('quiz_completions')
+
+    # One round-trip for the daily quiz completion and the seen topics; the quiz itself is cached
+    daily_quiz_id = f"daily_{today.isoformat()}"
+    daily_completion_ref = completions_ref.document(daily_quiz_id)
+    docs_by_path = {
+        doc.reference.path: doc
+        for doc in db.get_all([daily_completion_ref, seen_topics_ref(uid)])
+    }
+    daily_quiz_data = get_daily_quiz()
+
+    if daily_quiz_data:
+        quizzes_to_return.append(
+            _quiz_for_user(daily_quiz_id, daily_quiz_data, docs_by_path[daily_completion_ref.path])
+        )
+
+    # One snapshot of the active quizzes and one batched read of their completions
+    active_docs = list(active_quizzes_ref.stream())
+    completion_refs = [completions_ref.document(doc.id) for doc in active_docs]
+    completions = {doc.id: doc for doc in db.get_all(completion_refs)} if completion_refs else {}
 
     # Remove quizzes completed on a previous day
-    for doc in active_quizzes_ref.stream():
-        completion_doc = completions_ref.document(doc.id).get()
-        if completion_doc.exists and completion_doc.to_dict()["completed_at"].date() < today:
-            active_quizzes_ref.document(doc.id).delete()
+    stale_ids = {
+        doc.id for doc in active_docs
+        if completions[doc.id].exists and completions[doc.id].to_dict()["completed_at"].date() < today
+    }
+    if stale_ids:
+        cleanup = db.batch()
+        for quiz_id in stale_ids:
+            cleanup.delete(active_quizzes_ref.document(quiz_id))
+        cleanup.commit()
 
-    current_active_docs = list(active_quizzes_ref.stream())
-    
-    # Check if we need to generate new quizzes
-    if len(current_active_docs) < TARGET_COUNT:
-        num_needed = TARGET_COUNT - len(current_active_docs)
-        
-        # Get all topics the user has ever seen to avoid repeats
-        completed_topics = {comp.get("topic") for comp in completions_ref.stream()}
-        active_topics = {doc.to_dict().get("topic") for doc in current_active_docs}
-        excluded_topics = list(completed_topics.union(active_topics).union(set(DEFAULT_TOPICS)))
-
-        # Generate new quizzes dynamically
-        for _ in range(num_needed):
-            new_quiz_data = generate_new_quiz_with_new_topic("Intermediate", excluded_topics)
-            
-            if new_quiz_data:
-                active_quizzes_ref.add(new_quiz_data)
-                
-                # Add the new topic to the exclusion list
-                excluded_topics.append(new_quiz_data["topic"])
+    active_quizzes = [(doc.id, doc.to_dict()) for doc in active_docs if doc.id not in stale_ids]
+
+    # Check if we need new quizzes
+    if len(active_quizzes) < TARGET_COUNT:
+        num_needed = TARGET_COUNT - len(active_quizzes)
+
+        # Avoid repeating anything the user has seen or currently has
+        seen_topics = _load_seen_topics(uid, docs_by_path[seen_topics_ref(uid).path])
+        active_topics = {quiz_data.get("topic") for _, quiz_data in active_quizzes}
+        excluded_topics = list(seen_topics.union(active_topics).union(set(DEFAULT_TOPICS)))
 
-        current_active_docs = list(active_quizzes_ref.stream()) # Refresh the list
+        # Take ready-made quizzes from the pool instead of waiting on the model
+        try:
+            new_quizzes = claim_quizzes("Intermediate", num_needed, excluded_topics)
+        except Exception as e:
+            # e.g. the claim transaction ran out of retries under contention; serve what we have
+            print(f"Error claiming pooled quizzes for {uid}: {e}")
+            new_quizzes = []
+        if new_quizzes:
+            additions = db.batch()
+            for new_quiz_data in new_quizzes:
+                new_quiz_ref = active_quizzes_ref.document()
+                additions.set(new_quiz_ref, new_quiz_data)
+                active_quizzes.append((new_quiz_ref.id, new_quiz_data))
+            additions.commit()
+
+        # Top the pool back up after the response is sent
+        background_tasks.add_task(refill_pool)
 
     # Format the final list to return to the user
-    for doc in active_quizzes_ref.stream():
-        quiz_data = doc.to_dict()
-        completion_doc = completions_ref.document(doc.id).get()
-        
-        past_results_data = None
-        if completion_doc.exists:
-            past_results_data = PastResult(**completion_doc.to_dict())
-
-        quizzes_to_return.append({
-            "quiz_id": doc.id,
-            "topic": quiz_data.get("topic"),
-            "questions": quiz_data.get("questions"),
-            "is_completed": completion_doc.exists,
-            "past_results": past_results_data
-        })
+    for quiz_id, quiz_data in active_quizzes:
+        quizzes_to_return.append(_quiz_for_user(quiz_id, quiz_data, completions.get(quiz_id)))
 
     return quizzes_to_return
 
+@router.get("/daily-cache/stats")
+def get_daily_quiz_cache_stats(current_user: dict = Depends(get_current_user)):
+    return daily_quiz_cache.stats()
+
 @router.post("/{quiz_id}/submit", response_model=QuizResult)
 def submit_quiz(
     quiz_id: str,
@@ -135,13 +222,17 @@ def submit_quiz(
     # Create a transaction object from your Firestore client instance (db)
     transaction = db.transaction()
     
-    return submit_quiz_transactional(
+    result = submit_quiz_transactional(
         transaction=transaction,
         quiz_id=quiz_id,
         submission=submission,
         current_user=current_user
     )
 
+    # streak and safety score changed; drop the cached profile once the transaction has committed
+    invalidate_user_profile(current_user.get("uid"))
+    return result
+
 # A helper function to contain the transactional logic
 @firestore.transactional
 def submit_quiz_transactional(
@@ -161,17 +252,18 @@ def submit_quiz_transactional(
             detail="You have already submitted this quiz today"
         )
 
-    # Fetch correct answers based on quiz type (daily or personal)
+    # Fetch correct answers based on quiz type (daily from the cache, personal from Firestore)
     if is_daily_quiz:
-        quiz_ref = db.collection('daily_quizzes').document('current_daily')
+        quiz_data = get_daily_quiz()
     else:
         quiz_ref = db.collection('users').document(uid).collection('active_quizzes').document(quiz_id)
+        quiz_doc = quiz_ref.get(transaction=transaction)
+        quiz_data = quiz_doc.to_dict() if quiz_doc.exists else None
 
-    quiz_doc = quiz_ref.get(transaction=transaction)
-    if not quiz_doc.exists:
+    if not quiz_data:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Quiz not found")
     
-    correct_answers = quiz_doc.to_dict()["questions"]
+    correct_answers = quiz_data["questions"]
     
     # Score the quiz
     correct_count = 0
@@ -204,6 +296,11 @@ def submit_quiz_transactional(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User profile not found")
 
     user_data = user_doc.to_dict()
+
+    stats_ref = quiz_stats_ref(uid)
+    stats_doc = stats_ref.get(transaction=transaction)
+    stats_data = stats_doc.to_dict() if stats_doc.exists else {}
+
     user_streak = user_data.get("daily_quiz_streak", 0)
     last_completion = user_data.get("last_daily_quiz", None)
     
@@ -231,11 +328,17 @@ def submit_quiz_transactional(
 
     completed_at = datetime.now()
     
+    # Keep the running stats current so profile screens don't scan the history
+    transaction.set(stats_ref, add_completion_to_stats(stats_data, final_score, quiz_data.get("topic"), user_streak))
+
+    # Remember the topic so new quizzes don't repeat it
+    transaction.set(seen_topics_ref(uid), {"topics": firestore.ArrayUnion([quiz_data.get("topic")])}, merge=True)
+
     # Mark quiz as completed
     transaction.set(completion_ref, {
         "completed_at": completed_at,
         "final_score": final_score,
-        "topic": quiz_doc.to_dict().get("topic"),
+        "topic": quiz_data.get("topic"),
         "results": question_results,
         "questions": correct_answers
     })
@@ -249,22 +352,28 @@ def submit_quiz_transactional(
         "results": question_results
     }
 
-@router.get("/history", response_model=List[QuizForUser])
-def get_quiz_history(current_user: dict = Depends(get_current_user)):
+@router.get("/history", response_model=QuizHistoryPage)
+def get_quiz_history(
+    page_size: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    start_after: Optional[str] = None,
+    view: QuizHistoryView = QuizHistoryView.FULL,
+    current_user: dict = Depends(get_current_user)
+):
     uid = current_user.get("uid")
     history_list = []
     
     try:
-        # Query the user's quiz subcollection
-        completions_query = db.collection('users').document(uid).collection('quiz_completions').order_by('completed_at', direction=firestore.Query.DESCENDING)
-        docs = completions_query.stream()
+        # Query one page of the user's quiz subcollection, newest first
+        items, next_cursor = list_quiz_history(uid, page_size, start_after, summary=view == QuizHistoryView.SUMMARY)
         
         # Loop through each completion document and build the correct structure
-        for doc in docs:
-            completion_data = doc.to_dict()
-            
+        for quiz_id, completion_data in items:
+            if view == QuizHistoryView.SUMMARY:
+                history_list.append(QuizHistorySummary(quiz_id=quiz_id, **completion_data))
+                continue
+
             quiz_for_user_obj = {
-                "quiz_id": doc.id,
+                "quiz_id": quiz_id,
                 "topic": completion_data.get("topic"),
                 "questions": completion_data.get("questions"),
                 "is_completed": True,
@@ -274,12 +383,19 @@ def get_quiz_history(current_user: dict = Depends(get_current_user)):
                     "results": completion_data.get("results")
                 }
             }
-            history_list.append(quiz_for_user_obj)
+            history_list.append(QuizForUser(**quiz_for_user_obj))
             
-        return history_list
+        return QuizHistoryPage(items=history_list, next_cursor=next_cursor)
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"An error occurred while fetching quiz history: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+@router.get("/stats", response_model=QuizStats)
+def get_user_quiz_stats(current_user: dict = Depends(get_current_user)):
+    uid = current_user.get("uid")
+    return get_quiz_stats(uid)
@@ -1,7 +1,7 @@
 from core.security import get_current_user
 from fastapi import APIRouter, HTTPException, status, Depends
 from schemas.user import UserInfo, SafetyScoreUpdate, QuizStreakUpdate, ResolvedIncidentsUpdate
-from core.firebase_setup import db
+from services.user_profiles import get_user_profile, update_user_profile, profile_cache
 
 router = APIRouter()
 
@@ -9,21 +9,26 @@ router = APIRouter()
 def get_user_info(current_user: dict = Depends(get_current_user)):
     uid = current_user.get("uid")
     try:
-        user_doc_ref = db.collection('users').document(uid)
-        user_doc = user_doc_ref.get()
+        user_data = get_user_profile(uid)
 
-        if not user_doc.exists:
+        if user_data is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User profile not found"
             )
-        return user_doc.to_dict()
+        return user_data
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"An error occurred while fetching user data: {str(e)}"
         )
+
+@router.get("/profile-cache/stats")
+def get_profile_cache_stats(current_user: dict = Depends(get_current_user)):
+    return profile_cache.stats()
     
 
 @router.patch("/updateSafetyScore", response_model=UserInfo)
@@ -32,15 +37,12 @@ def update_safety_score(
     current_user: dict = Depends(get_current_user)
 ):
     uid = current_user.get("uid")
-    user_doc_ref = db.collection('users').document(uid)
     
     try:
-        user_doc_ref.update({"safety_score": score_data.safety_score})
-
-        updated_doc = user_doc_ref.get()
-        if not updated_doc.exists:
+        updated_data = update_user_profile(uid, {"safety_score": score_data.safety_score})
+        if updated_data is None:
             raise HTTPException(status_code=404, detail="User not found after update")
-        return updated_doc.to_dict()
+        return updated_data
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -52,15 +54,12 @@ def update_quiz_streak(
     current_user: dict = Depends(get_current_user)
 ):
     uid = current_user.get("uid")
-    user_doc_ref = db.collection('users').document(uid)
     
     try:
-        user_doc_ref.update({"daily_quiz_streak": streak_data.daily_quiz_streak})
-        
-        updated_doc = user_doc_ref.get()
-        if not updated_doc.exists:
+        updated_data = update_user_profile(uid, {"daily_quiz_streak": streak_data.daily_quiz_streak})
+        if updated_data is None:
             raise HTTPException(status_code=404, detail="User not found after update")
-        return updated_doc.to_dict()
+        return updated_data
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -72,15 +71,12 @@ def update_resolved_incidents(
     current_user: dict = Depends(get_current_user)
 ):
     uid = current_user.get("uid")
-    user_doc_ref = db.collection('users').document(uid)
     
     try:
-        user_doc_ref.update({"resolved_incidents": incidents_data.resolved_incidents})
-        
-        updated_doc = user_doc_ref.get()
-        if not updated_doc.exists:
+        updated_data = update_user_profile(uid, {"resolved_incidents": incidents_data.resolved_incidents})
+        if updated_data is None:
             raise HTTPException(status_code=404, detail="User not found after update")
-        return updated_doc.to_dict()
+        return updated_data
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
@@ -1,84 +1,180 @@
-from typing import List
-from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, status
+from typing import Optional
+from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, Query, status
 from fastapi.responses import StreamingResponse
 from core.security import get_current_user
-from core.firebase_setup import db, bucket
+from core.firebase_setup import db
 from firebase_admin import firestore
-from schemas.incident import Incident, IncidentQuizSubmission
-from datetime import datetime
-from google.genai import types
-from core.adk_setup import runner, session_service
+from schemas.incident import IncidentQuizSubmission, IncidentPage, IncidentView, IncidentFilters
+from schemas.job import Job, JobStage
+from core.job_queue import JobQueue, QueueFullError, get_analysis_queue
+from core.process_pool import VideoProcessPool, PoolSaturatedError, get_video_pool, pool_saturated_exception
+from starlette.concurrency import run_in_threadpool
+import numpy as np
+import asyncio
+from collections import deque
+import hashlib
+import io
 import shutil
 import os
 import uuid
-import zipfile
-import io
 import json
 
-from services.video_splitter import process_video_to_screenshots
+from services.video_splitter import plan_screenshots, extract_screenshot_batch, parallel_batch_count, FrameDeduplicator, ADAPTIVE_FRAME_BUDGET, DEDUP_HAMMING_THRESHOLD
+from services.zip_stream import ZipStreamWriter
+from services.analysis_pipeline import analyze_video
+from services.analysis_cache import cache_stats
+from services.incident_queries import list_user_incidents, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 
 UPLOADS_DIR = "temp_storage/uploads/"
-SCREENSHOTS_DIR = "temp_storage/screenshots/"
+# frames decoded per pool task; bounds how much JPEG data a request holds at once
+SCREENSHOT_BATCH_SIZE = 16
 
 router = APIRouter()
 
+def _screenshot_batches(plan: dict):
+    frame_indices = plan["frame_indices"]
+    # every sequential read decodes from frame 0, so batching it would cost O(n^2); one pass instead
+    if plan["mode"] == "sequential":
+        yield frame_indices
+        return
+    for start in range(0, len(frame_indices), SCREENSHOT_BATCH_SIZE):
+        yield frame_indices[start:start + SCREENSHOT_BATCH_SIZE]
+
+class _CleanupStreamingResponse(StreamingResponse):
+    """
+    Runs cleanup once the response is finished, including when the client disconnects
+    before the body generator is ever started (its own finally would never run then).
+    """
+    def __init__(self, *args, cleanup, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._cleanup = cleanup
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self._cleanup()
+
+def _submit_batches(pool: VideoProcessPool, source_path: str, plan: dict, batches, pending: deque, in_flight: int):
+    # keeps up to in_flight batches decoding in the pool; pending is in timeline order
+    while len(pending) < in_flight:
+        frame_indices = next(batches, None)
+        if frame_indices is None:
+            return
+        future = asyncio.ensure_future(
+            pool.run(extract_screenshot_batch, source_path, frame_indices, plan["fps"], plan["mode"], plan["precise"])
+        )
+        pending.append((frame_indices, future))
+
+def _cancel_batches(pending: deque):
+    for _, future in pending:
+        future.cancel()
+    pending.clear()
+
 @router.post("/process-video-and-download/")
-async def create_video_screenshots_and_download(file: UploadFile = File(...)):
+async def create_video_screenshots_and_download(
+    file: UploadFile = File(...),
+    selection: str = Query("interval", pattern="^(interval|adaptive)$"),
+    frame_budget: int = Query(ADAPTIVE_FRAME_BUDGET, ge=1),
+    dedup: bool = False,
+    dedup_threshold: int = Query(DEDUP_HAMMING_THRESHOLD, ge=0, le=64),
+    pool: VideoProcessPool = Depends(get_video_pool)
+):
+    # shed load before touching the upload if every pool slot is taken
+    try:
+        pool.acquire()
+    except PoolSaturatedError:
+        raise pool_saturated_exception()
+
     unique_request_id = str(uuid.uuid4())
+    # OpenCV can only decode from a path, so the upload itself still lands on disk once
     temp_video_path = os.path.join(UPLOADS_DIR, f"{unique_request_id}_{file.filename}")
-    output_screenshots_dir = os.path.join(SCREENSHOTS_DIR, unique_request_id)
 
     os.makedirs(UPLOADS_DIR, exist_ok=True)
-    os.makedirs(output_screenshots_dir, exist_ok=True)
+
+    def cleanup():
+        pool.release()
+        if os.path.exists(temp_video_path):
+            os.remove(temp_video_path)
+
+    # (frame_indices, future) for batches submitted to the pool but not yet zipped
+    pending = deque()
 
     try:
         with open(temp_video_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+            await run_in_threadpool(shutil.copyfileobj, file.file, buffer)
 
-        # gets array of screenshot filenames
-        screenshot_files = process_video_to_screenshots(
-            source_path=temp_video_path,
-            output_dir=output_screenshots_dir
-        )
+        plan = await pool.run(plan_screenshots, temp_video_path, 1, selection, frame_budget)
+        batches = _screenshot_batches(plan) if plan else iter(())
+        # long clips fan their batches out across the pool's workers; results are still zipped in order
+        in_flight = parallel_batch_count(plan["fps"], plan["frame_total"], pool.workers) if plan else 1
 
-        if not screenshot_files:
+        _submit_batches(pool, temp_video_path, plan, batches, pending, in_flight)
+        first_indices, first_future = pending.popleft() if pending else (None, None)
+        first_batch = await first_future if first_future else []
+
+        if not first_batch:
             raise HTTPException(
-                status_code=status.HTTP_400_BAD_unique_request,
+                status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Couldn't process video... no screenshots generated",
             )
+    except BaseException:
+        _cancel_batches(pending)
+        cleanup()
+        raise
 
-        # reads the array and zips the files into a zip buffer
-        zip_buffer = io.BytesIO()
-        with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
-            for filename in screenshot_files:
-                file_path = os.path.join(output_screenshots_dir, filename)
-                zip_file.write(file_path, arcname=filename)
-        
-        zip_buffer.seek(0)
-        
-        headers = {
-            'Content-Disposition': f'attachment; filename="screenshots_{unique_request_id}.zip"'
-        }
-
-        return StreamingResponse(
-            content=zip_buffer,
-            media_type="application/zip",
-            headers=headers
-        )
+    deduplicator = FrameDeduplicator(dedup_threshold) if dedup else None
 
-    finally:
-        if os.path.exists(temp_video_path):
-            os.remove(temp_video_path)
-        if os.path.exists(output_screenshots_dir):
-            shutil.rmtree(output_screenshots_dir)
+    async def zip_chunks():
+        writer = ZipStreamWriter()
+        indices, batch = first_indices, first_batch
+        try:
+            while True:
+                # a short batch means the stream ended before the reported frame count
+                if len(batch) < len(indices):
+                    _cancel_batches(pending)
+                else:
+                    # keep the pool busy with the following batches while this one is being zipped
+                    _submit_batches(pool, temp_video_path, plan, batches, pending, in_flight)
+
+                for filename, jpeg_bytes, frame_hash in batch:
+                    if deduplicator is not None and deduplicator.is_duplicate_hash(np.frombuffer(frame_hash, dtype=np.uint8)):
+                        continue
+                    yield writer.add(filename, jpeg_bytes)
+
+                if not pending:
+                    break
+                indices, future = pending.popleft()
+                batch = await future
+
+            # stats are only known once every frame has been seen, so they go in the last entry
+            if deduplicator is not None:
+                yield writer.add("dedup_stats.json", json.dumps(deduplicator.stats()).encode())
+
+            yield writer.close()
+        finally:
+            _cancel_batches(pending)
+
+    headers = {
+        'Content-Disposition': f'attachment; filename="screenshots_{unique_request_id}.zip"'
+    }
+
+    return _CleanupStreamingResponse(
+        content=zip_chunks(),
+        media_type="application/zip",
+        headers=headers,
+        cleanup=cleanup
+    )
 
 MAX_FILE_SIZE = 30 * 1024 * 1024  # 30 MB
+UPLOAD_CHUNK_SIZE = 1024 * 1024
 ACCEPTED_TYPES = ["video/mp4", "video/quicktime"]
 
-@router.post("/analyze", response_model=Incident, status_code=status.HTTP_201_CREATED)
+@router.post("/analyze", response_model=Job, status_code=status.HTTP_202_ACCEPTED)
 async def analyze_driving_video(
     file: UploadFile = File(...),
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user),
+    queue: JobQueue = Depends(get_analysis_queue)
 ):
     # Validate File
     if file.size > MAX_FILE_SIZE:
@@ -87,69 +183,73 @@ async def analyze_driving_video(
         raise HTTPException(status_code=415, detail="Unsupported file type")
 
     uid = current_user.get("uid")
-    unique_filename = f"incidents/{uid}/{uuid.uuid4()}-{file.filename}"
-    
+
+    # the upload is closed once we respond, so the job keeps its own copy,
+    # hashed while it is read so re-uploads of the same clip hit the analysis cache
+    await file.seek(0)
+    hasher = hashlib.sha256()
+    chunks = []
+    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+        hasher.update(chunk)
+        chunks.append(chunk)
+    video_bytes = b"".join(chunks)
+    content_hash = hasher.hexdigest()
+    filename = file.filename
+    content_type = file.content_type
+
+    async def run_job(job: Job):
+        async def report_stage(stage: JobStage, **fields):
+            await queue.store.update(job.job_id, stage=stage, **fields)
+
+        new_incident = await analyze_video(uid, io.BytesIO(video_bytes), filename, content_type, report_stage, content_hash)
+        await queue.store.update(job.job_id, stage=JobStage.DONE, incident_id=str(new_incident.incident_id))
+
     try:
-        # Upload to Firebase Storage
-        blob = bucket.blob(unique_filename)
-        await file.seek(0)
-        blob.upload_from_file(file.file, content_type=file.content_type)
-        blob.make_public()
-        video_url = blob.public_url
-        
-        # Agent/Gemini Analysis
-        session_id = str(uuid.uuid4())
-        agent_prompt = f"Process the driving incident from the video at {video_url} for user {uid}."
-        
-        await session_service.create_session(
-            app_name="driving_analysis_agent",
-            user_id=uid,
-            session_id=session_id
-        )
-        events = runner.run_async(
-            user_id=uid,
-            session_id=session_id,
-            new_message=types.Content(parts=[types.Part(text=agent_prompt)], role="user")
+        return await queue.submit(Job(user_id=uid), run_job)
+    except QueueFullError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many videos are being analyzed, try again shortly",
+            headers={"Retry-After": "30"}
         )
 
-        final_result = None
-        async for event in events:
-            if event.is_final_response():
-                json_string = event.content.parts[0].text
-                clean_json_string = json_string.strip().replace("```json", "").replace("```", "")
-                final_result = json.loads(clean_json_string)
-                break
-        
-        if final_result is None:
-            raise Exception("Agent did not produce a final result.")
-        
-        # --- START OF FIX ---
+@router.get("/analysis-cache/stats")
+def get_analysis_cache_stats(current_user: dict = Depends(get_current_user)):
+    return cache_stats()
 
-        # 1. IMPORTANT: Safely remove any 'user_id' that the agent might have included.
-        #    We only trust the uid from the authentication token.
-        final_result.pop('user_id', None)
-        
-        # 2. Let the Pydantic model create its own default values for incident_id and created_at.
-        new_incident = Incident(
-            user_id=uid,
-            **final_result
-        )
-        
-        # 3. Use model_dump(mode='json') to create a Firestore-compatible dictionary.
-        data_to_store = new_incident.model_dump(mode='json')
-        
-        # 4. Get the string version of the ID for the document path.
-        incident_id_str = str(new_incident.incident_id)
+async def _get_owned_job(queue: JobQueue, job_id: str, uid: str) -> Job:
+    job = await queue.store.get(job_id)
+    # don't reveal whether another user's job exists
+    if job is None or job.user_id != uid:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return job
 
-        # 5. Save the corrected dictionary to Firestore.
-        db.collection('incidents').document(incident_id_str).set(data_to_store)
+@router.get("/jobs/{job_id}", response_model=Job)
+async def get_analysis_job(
+    job_id: str,
+    current_user: dict = Depends(get_current_user),
+    queue: JobQueue = Depends(get_analysis_queue)
+):
+    return await _get_owned_job(queue, job_id, current_user.get("uid"))
 
-        # --- END OF FIX ---
+@router.get("/jobs/{job_id}/events")
+async def stream_analysis_job(
+    job_id: str,
+    current_user: dict = Depends(get_current_user),
+    queue: JobQueue = Depends(get_analysis_queue)
+):
+    await _get_owned_job(queue, job_id, current_user.get("uid"))
 
-        return new_incident
+    async def events():
+        # Server-Sent Events: one "stage" event per change, ending after done/failed
+        async for job in queue.store.watch(job_id):
+            yield f"event: stage\ndata: {job.model_dump_json()}\n\n"
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+    return StreamingResponse(
+        content=events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"}
+    )
 
 @router.post("/{incidentId}/submit-quiz")
 def submit_incident_quiz(
@@ -190,7 +290,8 @@ def submit_incident_quiz_transactional(
         # Save the user's answer to the incident document
         transaction.update(incident_ref, {
             "quiz.user_selected_index": user_index,
-            "quiz.is_correct": is_correct
+            "quiz.is_correct": is_correct,
+            "quiz_answered": True
         })
 
         return {"is_correct": is_correct}
@@ -198,22 +299,23 @@ def submit_incident_quiz_transactional(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/", response_model=List[Incident])
-async def get_user_incidents(current_user: dict = Depends(get_current_user)):
+@router.get("/", response_model=IncidentPage)
+async def get_user_incidents(
+    page_size: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    start_after: Optional[str] = None,
+    view: IncidentView = IncidentView.FULL,
+    filters: IncidentFilters = Depends(),
+    current_user: dict = Depends(get_current_user)
+):
     uid = current_user.get("uid")
     
     try:
-        # Query incidents collection from newest to oldest
-        incidents_query = db.collection('incidents').where('user_id', '==', uid).order_by('created_at', direction=firestore.Query.DESCENDING)
-        
-        # Stream the documents
-        docs = incidents_query.stream()
-        
-        # Create a list of incidents from the documents
-        incidents_list = [doc.to_dict() async for doc in docs]
-        
-        return incidents_list
-        
+        # Query incidents collection from newest to oldest, one page at a time
+        items, next_cursor = await list_user_incidents(uid, page_size, start_after, view == IncidentView.SUMMARY, filters)
+        return {"items": items, "next_cursor": next_cursor}
+
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -0,0 +1,33 @@
+"""
+One-off migration: sets the top-level quiz_answered flag on incidents created before it
+existed, so the quiz_answered filter and /incidents/stats count them.
+
+Run from the backend directory: 'python backfill_quiz_answered.py' (add --dry-run to only report).
+"""
+import argparse
+from core.firebase_setup import db
+
+def backfill(dry_run: bool = False) -> dict:
+    stats = {"scanned": 0, "updated": 0}
+
+    for doc in db.collection('incidents').stream():
+        stats["scanned"] += 1
+        incident_data = doc.to_dict()
+        if "quiz_answered" in incident_data:
+            continue
+
+        stats["updated"] += 1
+        if dry_run:
+            continue
+
+        answered = incident_data.get("quiz", {}).get("user_selected_index") is not None
+        doc.reference.update({"quiz_answered": answered})
+
+    return stats
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Set quiz_answered on existing incidents")
+    parser.add_argument("--dry-run", action="store_true", help="only report what would be updated")
+    args = parser.parse_args()
+
+    print(backfill(dry_run=args.dry_run))
@@ -0,0 +1,152 @@
+"""
+Measures how throughput of the async incident listings grows with concurrent requests.
+async_db is replaced by a stub that answers every query after FIRESTORE_LATENCY_SEC, so
+requests that wait on Firestore concurrently should finish together instead of queueing.
+
+Requests go through httpx.ASGITransport against GET /incidents/getAll and GET /video/,
+with 1, 10 and 50 in flight at a time.
+
+Run from the backend directory: 'python -m benchmarks.async_concurrency'
+(--latency and --requests change the stub latency and the requests per run).
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+import types
+from datetime import datetime
+from unittest.mock import MagicMock
+
+FIRESTORE_LATENCY_SEC = 0.05
+CONCURRENCY_LEVELS = (1, 10, 50)
+PAGE_SIZE = 20
+
+INCIDENT = {
+    "user_id": "benchmark-user",
+    "status": "open",
+    "created_at": datetime(2026, 1, 1).isoformat(),
+    "incident_summary": "The driver changed lanes without checking the blind spot.",
+    "severity": "medium",
+    "video_url": "https://example.com/incident.mp4",
+    "quiz": {
+        "question": "What should the driver have done before changing lanes?",
+        "options": ["Speed up", "Check mirrors and blind spot", "Brake hard", "Use the horn"],
+        "correct_answer_index": 1,
+        "explanation": "A mirror and shoulder check shows vehicles hidden in the blind spot."
+    },
+    "simulation_html": "",
+    "simulation_better_html": ""
+}
+
+class StubSnapshot:
+    def __init__(self, index: int):
+        self.id = f"incident-{index}"
+        self._data = {**INCIDENT, "incident_id": self.id}
+
+    def to_dict(self) -> dict:
+        return dict(self._data)
+
+class StubAsyncQuery:
+    """
+    Stands in for an async Firestore query: every builder call returns the query, and
+    stream() yields `limit` incidents after one round-trip of latency.
+    """
+    latency_sec = FIRESTORE_LATENCY_SEC
+
+    def __init__(self):
+        self._limit = PAGE_SIZE
+
+    def where(self, *args, **kwargs):
+        return self
+
+    def order_by(self, *args, **kwargs):
+        return self
+
+    def select(self, *args, **kwargs):
+        return self
+
+    def start_after(self, *args, **kwargs):
+        return self
+
+    def limit(self, count: int):
+        self._limit = count
+        return self
+
+    async def stream(self):
+        await asyncio.sleep(self.latency_sec)
+        for index in range(self._limit):
+            yield StubSnapshot(index)
+
+class StubAsyncClient:
+    def collection(self, name: str):
+        return StubAsyncQuery()
+
+def install_stubs():
+    # only the modules that need credentials are replaced; everything else is the real code
+    os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret")
+
+    firebase_setup = types.ModuleType("core.firebase_setup")
+    firebase_setup.db = MagicMock()
+    firebase_setup.async_db = StubAsyncClient()
+    firebase_setup.bucket = MagicMock()
+    firebase_setup.upload_blob_async = MagicMock()
+    firebase_setup.firebase_auth = MagicMock()
+    sys.modules["core.firebase_setup"] = firebase_setup
+
+    gemini_setup = types.ModuleType("core.gemini_setup")
+    gemini_setup.gemini_pro_model = MagicMock()
+    gemini_setup.gemini_flash_model = MagicMock()
+    sys.modules["core.gemini_setup"] = gemini_setup
+
+def build_app():
+    from fastapi import FastAPI
+    from api import incidents_api, video_api
+    from core.security import get_current_user
+
+    app = FastAPI()
+    app.include_router(video_api.router, prefix="/video")
+    app.include_router(incidents_api.router, prefix="/incidents")
+    app.dependency_overrides[get_current_user] = lambda: {"uid": "benchmark-user"}
+    return app
+
+async def run_level(client, path: str, concurrency: int, total_requests: int) -> dict:
+    slots = asyncio.Semaphore(concurrency)
+
+    async def one_request():
+        async with slots:
+            response = await client.get(path, params={"page_size": PAGE_SIZE})
+            response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one_request() for _ in range(total_requests)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "path": path,
+        "concurrency": concurrency,
+        "requests": total_requests,
+        "elapsed_sec": round(elapsed, 2),
+        "requests_per_sec": round(total_requests / elapsed, 1),
+    }
+
+async def main(latency_sec: float, total_requests: int):
+    install_stubs()
+    StubAsyncQuery.latency_sec = latency_sec
+
+    import httpx
+    app = build_app()
+
+    print(f"stub Firestore latency: {latency_sec * 1000:.0f} ms, {total_requests} requests per run")
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark") as client:
+        for path in ("/incidents/getAll", "/video/"):
+            for concurrency in CONCURRENCY_LEVELS:
+                print(await run_level(client, path, concurrency, total_requests))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure async endpoint throughput at rising concurrency")
+    parser.add_argument("--latency", type=float, default=FIRESTORE_LATENCY_SEC, help="stub Firestore latency in seconds")
+    parser.add_argument("--requests", type=int, default=200, help="requests per concurrency level")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.latency, args.requests))
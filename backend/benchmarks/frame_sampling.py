@@ -0,0 +1,83 @@
+"""
+Benchmarks one-screenshot-per-second frame sampling on generated clips at 30, 60 and 120 fps:
+the original loop (read() and decode every frame, keep every Nth) against read_frames in
+"sequential" mode (grab() every frame, decode only kept ones) and "seek" mode.
+
+Run from the backend directory: 'python -m benchmarks.frame_sampling' (--seconds and --size change the clips).
+"""
+import argparse
+import os
+import tempfile
+import time
+import cv2
+import numpy as np
+from services.video_splitter import read_frames, get_video_info, _target_frame_indices
+
+def make_clip(path: str, fps: int, seconds: int, size: tuple[int, int]):
+    width, height = size
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, size)
+    rng = np.random.default_rng(fps)
+    background = rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+    for frame_index in range(fps * seconds):
+        frame = background.copy()
+        # a moving block so consecutive frames differ like real footage
+        x = (frame_index * 4) % max(1, width - 60)
+        cv2.rectangle(frame, (x, height // 3), (x + 60, height // 3 + 40), (255, 255, 255), -1)
+        writer.write(frame)
+    writer.release()
+
+def original_loop(source_path: str, interval_sec: int = 1) -> int:
+    # the pre-seek implementation: every frame is decoded and color converted
+    video_data = cv2.VideoCapture(source_path)
+    frame_interval = int(video_data.get(cv2.CAP_PROP_FPS) * interval_sec)
+    kept = 0
+    frame_count = 0
+    while True:
+        success, _ = video_data.read()
+        if not success:
+            break
+        if frame_count % frame_interval == 0:
+            kept += 1
+        frame_count += 1
+    video_data.release()
+    return kept
+
+def sampled(source_path: str, mode: str) -> int:
+    info = get_video_info(source_path)
+    frame_indices = _target_frame_indices(info["fps"], info["frame_total"], 1)
+    return sum(1 for _ in read_frames(source_path, frame_indices, mode=mode))
+
+def measure(func, *args) -> dict:
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    kept = func(*args)
+    return {"wall_sec": time.perf_counter() - wall_start, "cpu_sec": time.process_time() - cpu_start, "kept": kept}
+
+def main(seconds: int, size: tuple[int, int]):
+    with tempfile.TemporaryDirectory() as tmp:
+        for fps in (30, 60, 120):
+            path = os.path.join(tmp, f"clip_{fps}fps.mp4")
+            make_clip(path, fps, seconds, size)
+            frame_total = fps * seconds
+
+            print(f"{fps} fps, {seconds} s, {size[0]}x{size[1]}:")
+            runs = {
+                "original": lambda: measure(original_loop, path),
+                "sequential": lambda: measure(sampled, path, "sequential"),
+                "seek": lambda: measure(sampled, path, "seek"),
+            }
+            for name, run in runs.items():
+                result = run()
+                print(
+                    f"  {name:<10} {result['wall_sec']:6.2f} s wall  {result['cpu_sec']:6.2f} s cpu  "
+                    f"{frame_total / result['wall_sec']:8.0f} source frames/s  {result['kept']} kept"
+                )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare frame sampling strategies")
+    parser.add_argument("--seconds", type=int, default=20)
+    parser.add_argument("--size", default="640x360", help="WIDTHxHEIGHT of the generated clips")
+    args = parser.parse_args()
+
+    width, height = (int(value) for value in args.size.split("x"))
+    main(args.seconds, (width, height))
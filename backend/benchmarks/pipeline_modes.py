@@ -0,0 +1,192 @@
+"""
+Compares the analysis pipeline modes (agent, direct, streaming) against a stubbed model,
+so the difference in latency and token use can be measured without Gemini or Firebase.
+
+The stub answers every call after MODEL_LATENCY_SEC plus output_tokens / OUTPUT_TOKENS_PER_SEC
+and counts tokens as characters / 4. In agent mode a scripted ADK model plays the agent: it calls
+the analysis tool, copies its output into the save tool, then returns the saved incident, which
+is what the real agent is instructed to do.
+
+Run from the backend directory: 'python -m benchmarks.pipeline_modes'
+(add --simulation-format html to compare with full HTML simulations).
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import time
+import types
+from unittest.mock import AsyncMock, MagicMock
+
+MODEL_LATENCY_SEC = 0.2
+OUTPUT_TOKENS_PER_SEC = 400
+
+ANALYSIS = {
+    "incident_summary": "The driver changed lanes without checking the blind spot and was cut off by a car merging from the right.",
+    "severity": "medium",
+    "better_action_quiz": {
+        "question": "What should the driver have done before changing lanes?",
+        "options": ["Speed up", "Check mirrors and blind spot", "Brake hard", "Use the horn"],
+        "correct_answer_index": 1,
+        "explanation": "A mirror and shoulder check shows vehicles hidden in the blind spot."
+    }
+}
+SCENE = {
+    "duration": 15,
+    "lanes": {"lane_count": 3, "lane_width": 10},
+    "vehicles": [
+        {"id": "ego_vehicle", "role": "ego", "color": "#2f80ed", "length": 4.5, "width": 2.0},
+        {"id": "car_1", "role": "other", "color": "#d0d0d0", "length": 4.5, "width": 2.0}
+    ],
+    "keyframes": [
+        {"t": t, "vehicles": [{"id": "ego_vehicle", "x": -10 + t, "z": 8 * t, "heading": 5}, {"id": "car_1", "x": 10 - t, "z": 8 * t + 12, "heading": -5}]}
+        for t in range(0, 16, 2)
+    ]
+}
+# a model-written Three.js page is usually a few thousand tokens
+HTML = "<!DOCTYPE html><html><head><script src='three.min.js'></script></head><body><script>" + "scene.add(new THREE.Mesh(geometry, material));\n" * 250 + "</script></body></html>"
+
+def tokens(text: str) -> int:
+    return len(text) // 4
+
+class ModelUsage:
+    def __init__(self):
+        self.calls = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+
+    async def respond(self, prompt: str, output: str):
+        self.calls += 1
+        self.input_tokens += tokens(prompt)
+        self.output_tokens += tokens(output)
+        await asyncio.sleep(MODEL_LATENCY_SEC + tokens(output) / OUTPUT_TOKENS_PER_SEC)
+
+usage = ModelUsage()
+
+class StubGeminiModel:
+    """
+    Stands in for gemini_pro_model: answers analysis, scene and HTML prompts with canned output.
+    """
+    def _output_for(self, prompt: str) -> str:
+        if "traffic reconstruction" in prompt:
+            return json.dumps(SCENE)
+        if "Three.js developer" in prompt:
+            return HTML
+        return json.dumps(ANALYSIS)
+
+    async def generate_content_async(self, prompt: str, stream: bool = False):
+        output = self._output_for(prompt)
+        if not stream:
+            await usage.respond(prompt, output)
+            return types.SimpleNamespace(text=output)
+
+        async def chunks():
+            usage.calls += 1
+            usage.input_tokens += tokens(prompt)
+            await asyncio.sleep(MODEL_LATENCY_SEC)
+            for start in range(0, len(output), 64):
+                chunk = output[start:start + 64]
+                usage.output_tokens += tokens(chunk)
+                await asyncio.sleep(tokens(chunk) / OUTPUT_TOKENS_PER_SEC)
+                yield types.SimpleNamespace(text=chunk)
+        return chunks()
+
+def install_stubs():
+    # only the modules that need credentials are replaced; everything else is the real code
+    firebase_setup = types.ModuleType("core.firebase_setup")
+    firebase_setup.db = MagicMock()
+    firebase_setup.async_db = MagicMock()
+    async_doc = firebase_setup.async_db.collection.return_value.document.return_value
+    async_doc.set = AsyncMock()
+    async_doc.update = AsyncMock()
+    firebase_setup.bucket = MagicMock()
+    firebase_setup.upload_blob_async = AsyncMock()
+    firebase_setup.firebase_auth = MagicMock()
+    sys.modules["core.firebase_setup"] = firebase_setup
+
+    gemini_setup = types.ModuleType("core.gemini_setup")
+    gemini_setup.gemini_pro_model = StubGeminiModel()
+    gemini_setup.gemini_flash_model = StubGeminiModel()
+    sys.modules["core.gemini_setup"] = gemini_setup
+
+def scripted_agent_model():
+    from google.adk.models import BaseLlm, LlmResponse
+    from google.genai import types as genai_types
+
+    class ScriptedAgentModel(BaseLlm):
+        """
+        Follows the driving agent's instructions without a real model: one turn per tool call
+        and one for the final answer, each paying for the whole conversation as input.
+        """
+        async def generate_content_async(self, llm_request, stream: bool = False):
+            prompt = json.dumps([content.model_dump(mode="json", exclude_none=True) for content in llm_request.contents])
+            last_part = llm_request.contents[-1].parts[0]
+
+            if last_part.function_response is None:
+                video_url, uid = re.search(r"video at (\S+) for user (\S+)\.", last_part.text).groups()
+                self._request = {"video_url": video_url, "user_id": uid}
+                part = genai_types.Part.from_function_call(name="process_video_and_generate_simulations", args={"video_url": video_url})
+                output = json.dumps(part.function_call.args)
+            elif last_part.function_response.name == "process_video_and_generate_simulations":
+                args = {**self._request, "full_report_data": last_part.function_response.response}
+                part = genai_types.Part.from_function_call(name="save_incident_report", args=args)
+                output = json.dumps(args)
+            else:
+                output = json.dumps(last_part.function_response.response)
+                part = genai_types.Part.from_text(text=output)
+
+            await usage.respond(prompt, output)
+            yield LlmResponse(
+                content=genai_types.Content(role="model", parts=[part]),
+                usage_metadata=genai_types.GenerateContentResponseUsageMetadata(
+                    prompt_token_count=tokens(prompt),
+                    candidates_token_count=tokens(output)
+                )
+            )
+
+    return ScriptedAgentModel(model="scripted-agent")
+
+async def run_mode(mode: str) -> dict:
+    from services import analysis_pipeline
+
+    usage.__init__()
+    start = time.perf_counter()
+    first_save = None
+
+    async def report_stage(stage, **fields):
+        nonlocal first_save
+        if first_save is None and stage.value == "simulating":
+            first_save = time.perf_counter() - start
+
+    runner = {"agent": analysis_pipeline._run_agent, "direct": analysis_pipeline._run_direct, "streaming": analysis_pipeline._run_streaming}[mode]
+    await runner("benchmark-user", "https://example.com/incident.mp4", report_stage)
+    total = time.perf_counter() - start
+
+    return {
+        "mode": mode,
+        "latency_sec": round(total, 2),
+        "partial_incident_sec": round(first_save, 2) if first_save is not None else None,
+        "model_calls": usage.calls,
+        "input_tokens": usage.input_tokens,
+        "output_tokens": usage.output_tokens,
+    }
+
+async def main(simulation_format: str):
+    os.environ["SIMULATION_FORMAT"] = simulation_format
+    install_stubs()
+
+    from core.agent_setup import driving_agent
+    driving_agent.model = scripted_agent_model()
+
+    print(f"simulation format: {simulation_format}")
+    for mode in ("agent", "direct", "streaming"):
+        print(await run_mode(mode))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare analysis pipeline modes against a stubbed model")
+    parser.add_argument("--simulation-format", choices=["keyframes", "html"], default="keyframes")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.simulation_format))
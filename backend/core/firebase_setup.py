@@ -1,5 +1,6 @@
+import asyncio
 import firebase_admin
-from firebase_admin import credentials, auth, firestore, storage
+from firebase_admin import credentials, auth, firestore, firestore_async, storage
 
 # IMPORTANT: must have service account json
 cred = credentials.Certificate("serviceAccountKey.json")
@@ -10,6 +11,21 @@ firebase_app = firebase_admin.initialize_app(cred, {
 
 db = firestore.client()
 
+# same database for async def code: awaiting its calls doesn't block the event loop
+async_db = firestore_async.client()
+
 firebase_auth = auth
 
-bucket = storage.bucket()
\ No newline at end of file
+bucket = storage.bucket()
+
+async def upload_blob_async(blob, file_obj, content_type: str, make_public: bool = False):
+    """
+    Uploads without blocking the event loop. google-cloud-storage has no async API,
+    so the upload runs on a worker thread.
+    """
+    def upload():
+        blob.upload_from_file(file_obj, content_type=content_type)
+        if make_public:
+            blob.make_public()
+
+    await asyncio.to_thread(upload)
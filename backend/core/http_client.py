@@ -0,0 +1,44 @@
+import os
+import httpx
+from fastapi import HTTPException, status
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# one pooled client for outbound calls, so repeated requests to the same host reuse
+# keep-alive TLS connections instead of handshaking every time
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", 50))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", 20))
+HTTP_KEEPALIVE_EXPIRY_SEC = float(os.getenv("HTTP_KEEPALIVE_EXPIRY_SEC", 60))
+HTTP_CONNECT_TIMEOUT_SEC = float(os.getenv("HTTP_CONNECT_TIMEOUT_SEC", 3))
+HTTP_READ_TIMEOUT_SEC = float(os.getenv("HTTP_READ_TIMEOUT_SEC", 10))
+# how long a request waits for a free connection once all of them are busy
+HTTP_POOL_TIMEOUT_SEC = float(os.getenv("HTTP_POOL_TIMEOUT_SEC", 5))
+
+http_client: httpx.AsyncClient | None = None
+
+def start_http_client():
+    global http_client
+    http_client = httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY_SEC
+        ),
+        timeout=httpx.Timeout(
+            HTTP_READ_TIMEOUT_SEC,
+            connect=HTTP_CONNECT_TIMEOUT_SEC,
+            pool=HTTP_POOL_TIMEOUT_SEC
+        )
+    )
+
+async def stop_http_client():
+    global http_client
+    if http_client is not None:
+        await http_client.aclose()
+        http_client = None
+
+def get_http_client() -> httpx.AsyncClient:
+    if http_client is None:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Outbound HTTP client is not available")
+    return http_client
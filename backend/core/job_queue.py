@@ -0,0 +1,154 @@
+import asyncio
+import os
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Awaitable, Callable
+from fastapi import HTTPException, status
+from dotenv import load_dotenv
+from schemas.job import Job, JobStage, FINISHED_STAGES
+
+load_dotenv()
+
+ANALYSIS_WORKERS = int(os.getenv("ANALYSIS_WORKERS", 2))
+ANALYSIS_MAX_PENDING = int(os.getenv("ANALYSIS_MAX_PENDING", 10))
+# finished jobs stay queryable this long before the in-memory store drops them
+JOB_RETENTION_SEC = int(os.getenv("JOB_RETENTION_SEC", 3600))
+
+class QueueFullError(Exception):
+    pass
+
+class JobStore(ABC):
+    """
+    Where job state lives. Anything shared between processes (Firestore, Redis)
+    can implement this; the in-memory store below is for single-process deployments.
+    """
+    @abstractmethod
+    async def create(self, job: Job) -> Job: ...
+
+    @abstractmethod
+    async def get(self, job_id: str) -> Job | None: ...
+
+    @abstractmethod
+    async def update(self, job_id: str, **fields) -> Job: ...
+
+    async def watch(self, job_id: str, poll_interval: float = 1.0) -> AsyncIterator[Job]:
+        # default: poll. stores with push notifications should override this
+        last_seen = None
+        while True:
+            job = await self.get(job_id)
+            if job is None:
+                return
+            if job.updated_at != last_seen:
+                last_seen = job.updated_at
+                yield job
+            if job.stage in FINISHED_STAGES:
+                return
+            await asyncio.sleep(poll_interval)
+
+class InMemoryJobStore(JobStore):
+    def __init__(self, retention_sec: int = JOB_RETENTION_SEC):
+        self._jobs: dict[str, Job] = {}
+        # one queue per open watch() so every stage change is delivered, even quick successive ones
+        self._subscribers: dict[str, list[asyncio.Queue]] = {}
+        self._retention = timedelta(seconds=retention_sec)
+
+    def _prune(self):
+        cutoff = datetime.utcnow() - self._retention
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.stage in FINISHED_STAGES and job.updated_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+            self._subscribers.pop(job_id, None)
+
+    async def create(self, job: Job) -> Job:
+        self._prune()
+        self._jobs[job.job_id] = job
+        return job
+
+    async def get(self, job_id: str) -> Job | None:
+        return self._jobs.get(job_id)
+
+    async def update(self, job_id: str, **fields) -> Job:
+        job = self._jobs[job_id].model_copy(update={**fields, "updated_at": datetime.utcnow()})
+        self._jobs[job_id] = job
+
+        for subscriber in self._subscribers.get(job_id, []):
+            subscriber.put_nowait(job)
+        return job
+
+    async def watch(self, job_id: str, poll_interval: float = 1.0) -> AsyncIterator[Job]:
+        job = self._jobs.get(job_id)
+        if job is None:
+            return
+
+        subscriber = asyncio.Queue()
+        self._subscribers.setdefault(job_id, []).append(subscriber)
+        try:
+            yield job
+            while job.stage not in FINISHED_STAGES:
+                job = await subscriber.get()
+                yield job
+        finally:
+            subscribers = self._subscribers.get(job_id, [])
+            if subscriber in subscribers:
+                subscribers.remove(subscriber)
+
+JobHandler = Callable[[Job], Awaitable[None]]
+
+class JobQueue:
+    """
+    Bounded queue drained by a fixed number of asyncio workers.
+    Handlers report progress through the store; failures are recorded on the job.
+    """
+    def __init__(self, store: JobStore, workers: int, max_pending: int):
+        self.store = store
+        self._workers = workers
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+        self._tasks: list[asyncio.Task] = []
+
+    def start(self):
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self._workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, job: Job, handler: JobHandler) -> Job:
+        if self._queue.full():
+            raise QueueFullError()
+        await self.store.create(job)
+        self._queue.put_nowait((job, handler))
+        return job
+
+    async def _worker(self):
+        while True:
+            job, handler = await self._queue.get()
+            try:
+                await handler(job)
+            except Exception as e:
+                print(f"Job {job.job_id} failed: {e}")
+                await self.store.update(job.job_id, stage=JobStage.FAILED, error=str(e))
+            finally:
+                self._queue.task_done()
+
+analysis_queue: JobQueue | None = None
+
+def start_analysis_queue(store: JobStore | None = None):
+    global analysis_queue
+    analysis_queue = JobQueue(store or InMemoryJobStore(), ANALYSIS_WORKERS, ANALYSIS_MAX_PENDING)
+    analysis_queue.start()
+
+async def stop_analysis_queue():
+    global analysis_queue
+    if analysis_queue is not None:
+        await analysis_queue.stop()
+        analysis_queue = None
+
+def get_analysis_queue() -> JobQueue:
+    if analysis_queue is None:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Video analysis is not available")
+    return analysis_queue
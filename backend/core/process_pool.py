@@ -0,0 +1,65 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from fastapi import HTTPException, status
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# CPU-bound OpenCV work runs here so it never blocks the event loop
+VIDEO_POOL_WORKERS = int(os.getenv("VIDEO_POOL_WORKERS", os.cpu_count() or 1))
+# how many video requests may hold the pool at once (running + waiting) before we shed load
+VIDEO_POOL_MAX_JOBS = int(os.getenv("VIDEO_POOL_MAX_JOBS", VIDEO_POOL_WORKERS * 2))
+VIDEO_POOL_RETRY_AFTER_SEC = int(os.getenv("VIDEO_POOL_RETRY_AFTER_SEC", 15))
+
+class PoolSaturatedError(Exception):
+    pass
+
+class VideoProcessPool:
+    def __init__(self, workers: int, max_jobs: int):
+        # spawn, not fork: forking after the gRPC Firestore clients have started threads is unsafe
+        self._executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        self.workers = workers
+        self.max_jobs = max_jobs
+        self.active_jobs = 0
+
+    def acquire(self):
+        # only touched from the event loop thread, so a plain counter is enough
+        if self.active_jobs >= self.max_jobs:
+            raise PoolSaturatedError()
+        self.active_jobs += 1
+
+    def release(self):
+        self.active_jobs = max(0, self.active_jobs - 1)
+
+    async def run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+video_pool: VideoProcessPool | None = None
+
+def start_video_pool():
+    global video_pool
+    video_pool = VideoProcessPool(VIDEO_POOL_WORKERS, VIDEO_POOL_MAX_JOBS)
+
+def shutdown_video_pool():
+    global video_pool
+    if video_pool is not None:
+        video_pool.shutdown()
+        video_pool = None
+
+def get_video_pool() -> VideoProcessPool:
+    if video_pool is None:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Video processing is not available")
+    return video_pool
+
+def pool_saturated_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Video processing is at capacity, try again shortly",
+        headers={"Retry-After": str(VIDEO_POOL_RETRY_AFTER_SEC)},
+    )
@@ -0,0 +1,17 @@
+"""
+Maintenance: drops entries from the video analysis cache (see services/analysis_cache.py).
+With no arguments it removes every entry made with an older analysis prompt; pass --hash
+to remove the entry for one video, e.g. after a bad analysis was cached.
+
+Run from the backend directory: 'python invalidate_analysis_cache.py' (add --hash <sha256> for one video).
+"""
+import argparse
+from services.analysis_cache import invalidate_analysis_cache
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Remove stale or specific entries from the video analysis cache")
+    parser.add_argument("--hash", dest="content_hash", help="SHA-256 of the video whose cache entry should be removed")
+    args = parser.parse_args()
+
+    removed = invalidate_analysis_cache(args.content_hash)
+    print({"removed": removed})
@@ -1,23 +1,36 @@
 from fastapi import FastAPI
-from api import video_api, firebase_auth, incidents_api, user_api, achievements_api, quiz_api
+from api import video_api, firebase_auth, incidents_api, user_api, achievements_api, quiz_api, dashboard_api
 from apscheduler.schedulers.background import BackgroundScheduler
-from api.quiz_api import update_daily_quiz
+from api.quiz_api import update_daily_quiz, refill_pool
+from services.quiz_pool import QUIZ_POOL_REFILL_MINUTES
+from datetime import datetime
 from contextlib import asynccontextmanager
 from fastapi.middleware.cors import CORSMiddleware
+from core.process_pool import start_video_pool, shutdown_video_pool
+from core.job_queue import start_analysis_queue, stop_analysis_queue
+from core.http_client import start_http_client, stop_http_client
 
 # Schedule update_daily_quiz to run every day at midnight (00:00) server time
 scheduler = BackgroundScheduler()
 scheduler.add_job(update_daily_quiz, 'cron', hour=0, minute=0)
+# Keep the pre-generated quiz pool stocked; the first run fills it right after startup
+scheduler.add_job(refill_pool, 'interval', minutes=QUIZ_POOL_REFILL_MINUTES, next_run_time=datetime.now(), max_instances=1)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # run on startup
     print("starting up...")
     scheduler.start()
+    start_video_pool()
+    start_analysis_queue()
+    start_http_client()
     yield
     # run on shutdown
     print("shutting down...")
     scheduler.shutdown()
+    shutdown_video_pool()
+    await stop_analysis_queue()
+    await stop_http_client()
 
 app = FastAPI(
     title="Driving Analysis API",
@@ -44,6 +57,7 @@ app.include_router(incidents_api.router, prefix="/incidents", tags=["Incidents"]
 app.include_router(user_api.router, prefix="/users", tags=["Users"])
 app.include_router(achievements_api.router, prefix="/achievements", tags=["Achievements"])
 app.include_router(quiz_api.router, prefix="/quiz", tags=["Quizzes"])
+app.include_router(dashboard_api.router, prefix="/dashboard", tags=["Dashboard"])
 
 @app.get("/", tags=["Root"])
 def read_root():
@@ -0,0 +1,38 @@
+"""
+One-off migration: moves inline simulation HTML out of existing incident documents
+into content-addressed blobs (see services/simulation_store.py).
+
+Run from the backend directory: 'python migrate_simulations.py' (add --dry-run to only report).
+"""
+import argparse
+from core.firebase_setup import db
+from services.simulation_store import externalize_simulations, REF_FIELDS
+
+def migrate(dry_run: bool = False) -> dict:
+    stats = {"scanned": 0, "migrated": 0, "bytes_moved": 0}
+
+    for doc in db.collection('incidents').stream():
+        stats["scanned"] += 1
+        incident_data = doc.to_dict()
+
+        inline_html = {field: incident_data.get(field) for field in REF_FIELDS if incident_data.get(field)}
+        if not inline_html:
+            continue
+
+        stats["migrated"] += 1
+        stats["bytes_moved"] += sum(len(html.encode("utf-8")) for html in inline_html.values())
+        if dry_run:
+            continue
+
+        updates = externalize_simulations(inline_html)
+        doc.reference.update(updates)
+        print(f"Migrated incident {doc.id}")
+
+    return stats
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move inline simulation HTML into blob storage")
+    parser.add_argument("--dry-run", action="store_true", help="only report what would be migrated")
+    args = parser.parse_args()
+
+    print(migrate(dry_run=args.dry_run))
@@ -0,0 +1,21 @@
+from pydantic import BaseModel
+from typing import Dict, List, Optional
+from schemas.user import UserInfo
+from schemas.achievement import Achievement
+from schemas.incident import IncidentStats
+
+class ActiveQuizSummary(BaseModel):
+    quiz_id: str
+    topic: str
+    is_daily: bool = False
+    is_completed: bool = False
+
+class Dashboard(BaseModel):
+    profile: UserInfo
+    recent_achievements: List[Achievement] = []
+    active_quizzes: List[ActiveQuizSummary] = []
+    incident_stats: Optional[IncidentStats] = None
+    # how long each section took, in milliseconds; the sections run concurrently
+    timings_ms: Dict[str, float]
+    # sections that failed, with the reason; the rest of the dashboard is still returned
+    errors: Dict[str, str] = {}
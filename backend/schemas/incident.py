@@ -1,8 +1,9 @@
 from pydantic import BaseModel, Field
 from datetime import datetime
 from enum import Enum
-from typing import List, Optional
+from typing import Dict, List, Optional, Union
 from uuid import UUID, uuid4
+from schemas.simulation import SimulationScene, SimulationRef
 
 class SeverityLevel(str, Enum):
     LOW = "low"
@@ -13,6 +14,14 @@ class IncidentStatus(str, Enum):
     OPEN = "open"
     ARCHIVED = "archived"
 
+class SimulationVariant(str, Enum):
+    ACTUAL = "actual"
+    BETTER = "better"
+
+class IncidentView(str, Enum):
+    FULL = "full"
+    SUMMARY = "summary"
+
 class IncidentQuiz(BaseModel):
     question: str
     options: List[str]
@@ -48,6 +57,46 @@ class Incident(BaseModel):
     quiz: IncidentQuiz
     simulation_html: str
     simulation_better_html: str
+    # compact keyframe scenes; when set, the html fields above are rendered from them on read
+    simulation_scene: Optional[SimulationScene] = None
+    simulation_better_scene: Optional[SimulationScene] = None
+    # html kept in Storage; list queries then don't carry it
+    simulation_ref: Optional[SimulationRef] = None
+    simulation_better_ref: Optional[SimulationRef] = None
+    # simulations that failed to generate and can be retried
+    failed_simulations: List[str] = []
+    # simulations still being generated; the rest of the incident can already be shown
+    pending_simulations: List[str] = []
+    # top-level copy of "quiz has an answer" so listings can filter on it
+    quiz_answered: bool = False
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+# lightweight projection for list views
+class IncidentSummary(BaseModel):
+    incident_id: str
+    status: IncidentStatus = IncidentStatus.OPEN
+    created_at: datetime
+    incident_summary: str
+    severity: SeverityLevel
+    video_url: str
+
+# query parameters shared by the incident listings; unset filters are ignored
+class IncidentFilters(BaseModel):
+    severity: Optional[SeverityLevel] = None
+    status: Optional[IncidentStatus] = None
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+    quiz_answered: Optional[bool] = None
+
+class IncidentStats(BaseModel):
+    total: int
+    by_severity: Dict[SeverityLevel, int]
+    by_status: Dict[IncidentStatus, int]
+    quiz_answered: int
+
+class IncidentPage(BaseModel):
+    items: List[Union[Incident, IncidentSummary]]
+    # pass as start_after to get the next page; None on the last page
+    next_cursor: Optional[str] = None
@@ -0,0 +1,26 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from enum import Enum
+from typing import Optional
+from uuid import uuid4
+
+class JobStage(str, Enum):
+    QUEUED = "queued"
+    UPLOADED = "uploaded"
+    ANALYZING = "analyzing"
+    SAVING = "saving"
+    SIMULATING = "simulating"
+    DONE = "done"
+    FAILED = "failed"
+
+FINISHED_STAGES = {JobStage.DONE, JobStage.FAILED}
+
+class Job(BaseModel):
+    job_id: str = Field(default_factory=lambda: str(uuid4()))
+    user_id: str
+    stage: JobStage = JobStage.QUEUED
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    incident_id: Optional[str] = None
+    error: Optional[str] = None
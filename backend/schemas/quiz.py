@@ -1,6 +1,6 @@
 from datetime import datetime
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Dict, List, Optional, Union
 from enum import Enum
 
 class QuestionType(str, Enum):
@@ -58,3 +58,26 @@ class QuizForUser(BaseModel):
     questions: List[QuestionForUser]
     is_completed: bool = False
     past_results: Optional[PastResult] = None
+
+class QuizHistoryView(str, Enum):
+    FULL = "full"
+    SUMMARY = "summary"
+
+# lightweight projection for history lists
+class QuizHistorySummary(BaseModel):
+    quiz_id: str
+    topic: str
+    completed_at: datetime
+    final_score: float
+
+class QuizHistoryPage(BaseModel):
+    items: List[Union[QuizForUser, QuizHistorySummary]]
+    # pass as start_after to get the next page; None on the last page
+    next_cursor: Optional[str] = None
+
+class QuizStats(BaseModel):
+    attempts: int = 0
+    average_score: float = 0.0
+    best_score: float = 0.0
+    attempts_by_topic: Dict[str, int] = {}
+    best_streak: int = 0
@@ -0,0 +1,65 @@
+from pydantic import BaseModel, Field, model_validator
+from enum import Enum
+from typing import List
+
+class VehicleRole(str, Enum):
+    EGO = "ego"
+    OTHER = "other"
+
+class Vehicle(BaseModel):
+    id: str
+    role: VehicleRole = VehicleRole.OTHER
+    color: str = Field("#d0d0d0", pattern=r"^#[0-9a-fA-F]{6}$")
+    length: float = Field(4.5, gt=0, le=30)
+    width: float = Field(2.0, gt=0, le=5)
+
+# x is the lateral position (0 = road centre), z the distance along the road,
+# heading is in degrees with 0 pointing down the road
+class VehiclePose(BaseModel):
+    id: str
+    x: float
+    z: float
+    heading: float = 0
+
+class Keyframe(BaseModel):
+    t: float = Field(ge=0)
+    vehicles: List[VehiclePose]
+
+class LaneLayout(BaseModel):
+    lane_count: int = Field(2, ge=1, le=8)
+    lane_width: float = Field(10, gt=0)
+
+class SimulationScene(BaseModel):
+    duration: float = Field(15, gt=0, le=60)
+    lanes: LaneLayout = LaneLayout()
+    vehicles: List[Vehicle] = Field(min_length=1)
+    keyframes: List[Keyframe] = Field(min_length=2)
+
+    @model_validator(mode="after")
+    def check_references(self):
+        egos = [vehicle for vehicle in self.vehicles if vehicle.role == VehicleRole.EGO]
+        if len(egos) != 1:
+            raise ValueError("Scene must have exactly one ego vehicle")
+
+        vehicle_ids = {vehicle.id for vehicle in self.vehicles}
+        if len(vehicle_ids) != len(self.vehicles):
+            raise ValueError("Vehicle ids must be unique")
+        times = [keyframe.t for keyframe in self.keyframes]
+        if times != sorted(times) or times[-1] > self.duration:
+            raise ValueError("Keyframe times must be increasing and within the duration")
+
+        for keyframe in self.keyframes:
+            unknown = {pose.id for pose in keyframe.vehicles} - vehicle_ids
+            if unknown:
+                raise ValueError(f"Keyframe at t={keyframe.t} references unknown vehicles {sorted(unknown)}")
+
+        # the camera follows the ego vehicle, so it needs a pose from the first frame on
+        if all(pose.id != egos[0].id for pose in self.keyframes[0].vehicles):
+            raise ValueError("The ego vehicle must appear in the first keyframe")
+        return self
+
+# pointer to simulation HTML kept in Storage instead of inline in the incident document
+class SimulationRef(BaseModel):
+    blob_name: str
+    size: int
+    compressed_size: int
@@ -0,0 +1,96 @@
+from core.firebase_setup import db, async_db
+from schemas.incident import Incident
+from services.driving_service import PROMPT_VERSION
+from firebase_admin import firestore
+from datetime import datetime
+
+# content-addressed index: one document per SHA-256 of an uploaded video
+cache_collection = db.collection('video_analysis_cache')
+async_cache_collection = async_db.collection('video_analysis_cache')
+
+# per-process counters, exposed through cache_stats()
+_stats = {"hits": 0, "misses": 0, "stale": 0}
+
+async def lookup_analysis(content_hash: str) -> dict | None:
+    """
+    Returns the cached entry for this video, or None if there is none or it was
+    produced with a different analysis prompt.
+    """
+    doc = await async_cache_collection.document(content_hash).get()
+    if not doc.exists:
+        _stats["misses"] += 1
+        return None
+
+    entry = doc.to_dict()
+    if entry.get("prompt_version") != PROMPT_VERSION:
+        _stats["stale"] += 1
+        _stats["misses"] += 1
+        return None
+
+    _stats["hits"] += 1
+    await async_cache_collection.document(content_hash).update({
+        "hit_count": firestore.Increment(1),
+        "last_hit_at": datetime.utcnow()
+    })
+    return entry
+
+async def store_analysis(content_hash: str, blob_name: str, video_url: str, incident: Incident):
+    # keep only what is shared between users; answers and ids are per incident
+    quiz = incident.quiz.model_dump(mode='json', exclude={"user_selected_index", "is_correct"})
+
+    await async_cache_collection.document(content_hash).set({
+        "prompt_version": PROMPT_VERSION,
+        "blob_name": blob_name,
+        "video_url": video_url,
+        "incident_summary": incident.incident_summary,
+        "severity": incident.severity.value,
+        "quiz": quiz,
+        "simulation_html": incident.simulation_html,
+        "simulation_better_html": incident.simulation_better_html,
+        "simulation_ref": incident.simulation_ref.model_dump() if incident.simulation_ref else None,
+        "simulation_better_ref": incident.simulation_better_ref.model_dump() if incident.simulation_better_ref else None,
+        "simulation_scene": incident.simulation_scene.model_dump(mode='json') if incident.simulation_scene else None,
+        "simulation_better_scene": incident.simulation_better_scene.model_dump(mode='json') if incident.simulation_better_scene else None,
+        "created_at": datetime.utcnow(),
+        "hit_count": 0
+    })
+
+def incident_from_cache(uid: str, entry: dict) -> Incident:
+    return Incident(
+        user_id=uid,
+        video_url=entry["video_url"],
+        incident_summary=entry["incident_summary"],
+        severity=entry["severity"],
+        quiz=entry["quiz"],
+        simulation_html=entry["simulation_html"],
+        simulation_better_html=entry["simulation_better_html"],
+        simulation_scene=entry.get("simulation_scene"),
+        simulation_better_scene=entry.get("simulation_better_scene"),
+        simulation_ref=entry.get("simulation_ref"),
+        simulation_better_ref=entry.get("simulation_better_ref")
+    )
+
+def invalidate_analysis_cache(content_hash: str | None = None) -> int:
+    """
+    Deletes one cache entry, or every entry made with an older prompt when no hash is given.
+    The stored video blobs are left alone since incidents still point at them.
+    Returns the number of entries removed.
+    """
+    if content_hash is not None:
+        cache_collection.document(content_hash).delete()
+        return 1
+
+    removed = 0
+    for doc in cache_collection.stream():
+        if doc.to_dict().get("prompt_version") != PROMPT_VERSION:
+            doc.reference.delete()
+            removed += 1
+    return removed
+
+def cache_stats() -> dict:
+    lookups = _stats["hits"] + _stats["misses"]
+    return {
+        **_stats,
+        "hit_rate": _stats["hits"] / lookups if lookups else 0.0,
+        "prompt_version": PROMPT_VERSION
+    }
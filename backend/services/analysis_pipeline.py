@@ -0,0 +1,167 @@
+from typing import Awaitable, Callable, BinaryIO
+from schemas.incident import Incident
+from schemas.job import JobStage
+from core.firebase_setup import async_db, bucket, upload_blob_async
+from google.genai import types
+from core.adk_setup import runner, session_service
+from services.analysis_cache import lookup_analysis, store_analysis, incident_from_cache
+from services.simulation_store import externalize_simulations
+from services.driving_service import (
+    process_video_and_generate_simulations,
+    save_incident_report,
+    stream_incident_analysis,
+    generate_simulation,
+    simulation_fields,
+    SIMULATIONS
+)
+from dotenv import load_dotenv
+import asyncio
+import os
+import uuid
+import json
+
+load_dotenv()
+
+# "agent": the ADK agent decides when to call the analysis and save tools.
+# "direct": call the same two services in order ourselves, skipping the
+# agent's extra model round-trips and its copy of the simulation HTML.
+# "streaming": like direct, but the analysis is streamed and saved as a partial
+# incident before the simulations finish.
+ANALYSIS_PIPELINE_MODES = ("agent", "direct", "streaming")
+ANALYSIS_PIPELINE_MODE = os.getenv("ANALYSIS_PIPELINE_MODE", "agent")
+if ANALYSIS_PIPELINE_MODE not in ANALYSIS_PIPELINE_MODES:
+    raise ValueError(f"ANALYSIS_PIPELINE_MODE must be one of {', '.join(ANALYSIS_PIPELINE_MODES)}, got '{ANALYSIS_PIPELINE_MODE}'")
+
+# called as report_stage(stage, **job_fields)
+StageCallback = Callable[..., Awaitable[None]]
+
+async def _run_agent(uid: str, video_url: str, report_stage: StageCallback) -> Incident:
+    session_id = str(uuid.uuid4())
+    agent_prompt = f"Process the driving incident from the video at {video_url} for user {uid}."
+
+    await session_service.create_session(
+        app_name="driving_analysis_agent",
+        user_id=uid,
+        session_id=session_id
+    )
+    events = runner.run_async(
+        user_id=uid,
+        session_id=session_id,
+        new_message=types.Content(parts=[types.Part(text=agent_prompt)], role="user")
+    )
+
+    final_result = None
+    async for event in events:
+        if event.is_final_response():
+            json_string = event.content.parts[0].text
+            clean_json_string = json_string.strip().replace("```json", "").replace("```", "")
+            final_result = json.loads(clean_json_string)
+            break
+
+    if final_result is None:
+        raise Exception("Agent did not produce a final result.")
+
+    await report_stage(JobStage.SAVING)
+
+    # We only trust the uid from the authentication token.
+    final_result.pop('user_id', None)
+
+    # Let the Pydantic model create its own default values for incident_id and created_at.
+    new_incident = Incident(
+        user_id=uid,
+        **final_result
+    )
+
+    # Use model_dump(mode='json') to create a Firestore-compatible dictionary.
+    data_to_store = await asyncio.to_thread(externalize_simulations, new_incident.model_dump(mode='json'))
+    await async_db.collection('incidents').document(str(new_incident.incident_id)).set(data_to_store)
+
+    return Incident.model_validate(data_to_store)
+
+async def _run_direct(uid: str, video_url: str, report_stage: StageCallback) -> Incident:
+    report = await process_video_and_generate_simulations(video_url)
+    if not report:
+        raise Exception("Model did not produce a valid report.")
+
+    await report_stage(JobStage.SAVING)
+    incident_dict = await save_incident_report(uid, video_url, report)
+    return Incident.model_validate(incident_dict)
+
+async def _run_streaming(uid: str, video_url: str, report_stage: StageCallback) -> Incident:
+    simulation_tasks = {
+        report_key: asyncio.create_task(generate_simulation(video_url, report_key))
+        for report_key in SIMULATIONS
+    }
+
+    try:
+        analysis = await stream_incident_analysis(video_url)
+    except Exception:
+        for task in simulation_tasks.values():
+            task.cancel()
+        raise
+
+    # save what we have so the client can show the summary and quiz right away
+    await report_stage(JobStage.SAVING)
+    partial_report = {
+        "analysis": analysis,
+        "simulation_actual_html": "",
+        "simulation_better_outcome_html": "",
+        "pending_simulations": [field for field, _ in SIMULATIONS.values()]
+    }
+    incident_dict = await save_incident_report(uid, video_url, partial_report)
+    partial_incident = Incident.model_validate(incident_dict)
+    await report_stage(JobStage.SIMULATING, incident_id=partial_incident.incident_id)
+
+    results = await asyncio.gather(*simulation_tasks.values(), return_exceptions=True)
+
+    updates = {"pending_simulations": [], "failed_simulations": []}
+    for report_key, result in zip(simulation_tasks, results):
+        if isinstance(result, Exception):
+            updates["failed_simulations"].append(SIMULATIONS[report_key][0])
+        else:
+            updates.update(await asyncio.to_thread(simulation_fields, report_key, result))
+
+    await async_db.collection('incidents').document(partial_incident.incident_id).update(updates)
+
+    # validate rather than model_copy, so the new scene and ref dicts become models
+    return Incident.model_validate({**partial_incident.model_dump(mode='json'), **updates})
+
+async def analyze_video(
+    uid: str,
+    video_file: BinaryIO,
+    filename: str,
+    content_type: str,
+    report_stage: StageCallback,
+    content_hash: str | None = None
+) -> Incident:
+    # Same clip analyzed before: reuse its blob and analysis instead of paying for both again
+    if content_hash is not None:
+        cached = await lookup_analysis(content_hash)
+        if cached is not None:
+            await report_stage(JobStage.UPLOADED)
+            await report_stage(JobStage.SAVING)
+            new_incident = incident_from_cache(uid, cached)
+            await async_db.collection('incidents').document(str(new_incident.incident_id)).set(new_incident.model_dump(mode='json'))
+            return new_incident
+
+    unique_filename = f"incidents/{uid}/{uuid.uuid4()}-{filename}"
+
+    # Upload to Firebase Storage
+    blob = bucket.blob(unique_filename)
+    await upload_blob_async(blob, video_file, content_type, make_public=True)
+    video_url = blob.public_url
+    await report_stage(JobStage.UPLOADED)
+
+    await report_stage(JobStage.ANALYZING)
+    if ANALYSIS_PIPELINE_MODE == "streaming":
+        new_incident = await _run_streaming(uid, video_url, report_stage)
+    elif ANALYSIS_PIPELINE_MODE == "direct":
+        new_incident = await _run_direct(uid, video_url, report_stage)
+    else:
+        new_incident = await _run_agent(uid, video_url, report_stage)
+
+    # incidents missing a simulation aren't worth sharing with other uploads
+    if content_hash is not None and not new_incident.failed_simulations:
+        await store_analysis(content_hash, unique_filename, video_url, new_incident)
+
+    return new_incident
@@ -2,21 +2,27 @@ from google.adk.tools import FunctionTool
 from schemas.incident import Incident
 from core.firebase_setup import db
 from datetime import datetime
+from schemas.simulation import SimulationScene
+import asyncio
+import os
 import uuid
 import json
+import hashlib
 
 from core.gemini_setup import gemini_pro_model
+from services.stream_json import IncrementalObjectParser
+from services.simulation_renderer import SCENE_FIELDS
+from services.simulation_store import externalize_simulations
 
-def process_video_and_generate_simulations(video_url: str) -> dict:
-    prompt = f"""
-    ROLE: You are an expert system combining a traffic analyst and a senior Three.js developer.
-    TASK: Analyze the driving incident from the video at {video_url} and prepare a complete lesson with simulations.
+INCIDENT_ANALYSIS_PROMPT = """
+    ROLE: You are an expert traffic analyst.
+    TASK: Analyze the driving incident from the video at {video_url} and prepare a short lesson.
 
     OUTPUT:
     You MUST output a single, valid JSON object and nothing else. The JSON object must contain these exact keys:
-    - "analysis": An object containing "incident_summary", "severity", and "better_action_quiz".
-    - "simulation_actual_html": A string containing the complete, self-contained HTML/JS code for a simulation of what ACTUALLY happened.
-    - "simulation_better_outcome_html": A string containing the complete, self-contained HTML/JS code for a simulation of the BETTER outcome.
+    - "incident_summary": A string summarizing what happened.
+    - "severity": The severity of the incident.
+    - "better_action_quiz": A quiz about what the driver should have done.
 
     CRITICAL REQUIREMENTS FOR JSON STRUCTURE:
     1.  The "severity" value MUST be one of three exact lowercase strings: "low", "medium", or "high".
@@ -27,6 +33,14 @@ def process_video_and_generate_simulations(video_url: str) -> dict:
           "correct_answer_index": <An integer from 0 to 3>,
           "explanation": "A string explaining the correct answer."
         }}
+    """
+
+SIMULATION_PROMPT = """
+    ROLE: You are a senior Three.js developer working with a traffic analyst.
+    TASK: Watch the driving incident in the video at {video_url} and build a simulation of {scenario}.
+
+    OUTPUT:
+    You MUST output only the complete, self-contained HTML document (with embedded JavaScript and Three.js) and nothing else.
 
     CRITICAL REQUIREMENTS FOR SIMULATIONS:
     1.  NO SYNTAX ERRORS: The generated code must be 100% complete and runnable.
@@ -37,19 +51,170 @@ def process_video_and_generate_simulations(video_url: str) -> dict:
     * Use a "chase camera" view, positioned behind and slightly above the `ego_vehicle`.
     * The animation must smoothly interpolate between the keyframes provided in the table to create a fluid 15-second simulation of the event.
     """
-    response = gemini_pro_model.generate_content(prompt)
-    # import json
-    try:
-        raw_text = response.text
+
+SIMULATION_SCENE_PROMPT = """
+    ROLE: You are a traffic reconstruction expert.
+    TASK: Watch the driving incident in the video at {video_url} and describe a 3D simulation of {scenario}.
+    The scene is rendered by our own Three.js template (dark gray road, white dashed lanes, chase camera
+    behind the ego vehicle), so you only describe the lanes, the vehicles and how they move.
+
+    OUTPUT:
+    You MUST output a single, valid JSON object and nothing else, in this exact format:
+        {{
+          "duration": 15,
+          "lanes": {{"lane_count": <1-8>, "lane_width": 10}},
+          "vehicles": [
+            {{"id": "ego_vehicle", "role": "ego", "color": "#2f80ed", "length": 4.5, "width": 2.0}},
+            {{"id": "car_1", "role": "other", "color": "#d0d0d0", "length": 4.5, "width": 2.0}}
+          ],
+          "keyframes": [
+            {{"t": 0, "vehicles": [{{"id": "ego_vehicle", "x": -5, "z": 0, "heading": 0}}, {{"id": "car_1", "x": 5, "z": 20, "heading": 0}}]}}
+          ]
+        }}
+
+    CRITICAL REQUIREMENTS:
+    1.  Exactly one vehicle has "role": "ego" (the camera car). Colors are 6-digit hex strings.
+    2.  "x" is the lateral position in world units (0 is the road centre, lanes are 10 units wide), "z" is the distance along the road, "heading" is in degrees (0 = straight down the road).
+    3.  Keyframe "t" values are seconds, increasing, between 0 and "duration". Use enough keyframes (usually 6-12) for the motion to read clearly; the template interpolates smoothly between them.
+    4.  Every vehicle id used in a keyframe must be declared in "vehicles", and vehicle ids must be unique.
+    5.  The ego vehicle must have a pose in the first keyframe.
+    """
+
+# "keyframes": the model describes each simulation as compact scene JSON, rendered from
+# templates/simulation.html when the incident is read. "html": the model writes the whole page.
+SIMULATION_FORMAT = os.getenv("SIMULATION_FORMAT", "keyframes")
+
+# report key -> (Incident field, what the simulation should show)
+SIMULATIONS = {
+    "simulation_actual_html": ("simulation_html", "what ACTUALLY happened"),
+    "simulation_better_outcome_html": ("simulation_better_html", "the BETTER outcome, where the driver takes the safest action"),
+}
+
+# a failed simulation call is retried on its own, without regenerating the analysis
+MAX_SIMULATION_ATTEMPTS = 2
+
+# cached analyses made with a different prompt are treated as stale
+PROMPT_VERSION = hashlib.sha256(
+    (INCIDENT_ANALYSIS_PROMPT + SIMULATION_PROMPT + SIMULATION_SCENE_PROMPT + SIMULATION_FORMAT).encode()
+).hexdigest()[:12]
+
+async def generate_incident_analysis(video_url: str) -> dict:
+    prompt = INCIDENT_ANALYSIS_PROMPT.format(video_url=video_url)
+    response = await gemini_pro_model.generate_content_async(prompt)
+
+    raw_text = response.text
+    json_start = raw_text.find('{')
+    json_end = raw_text.rfind('}') + 1
+    return json.loads(raw_text[json_start:json_end])
+
+# everything a partial incident needs from the analysis
+ANALYSIS_KEYS = ("incident_summary", "severity", "better_action_quiz")
+
+async def stream_incident_analysis(video_url: str) -> dict:
+    """
+    Streams the analysis call and returns as soon as every key in ANALYSIS_KEYS has been
+    parsed, without waiting for the rest of the response.
+    """
+    prompt = INCIDENT_ANALYSIS_PROMPT.format(video_url=video_url)
+    response = await gemini_pro_model.generate_content_async(prompt, stream=True)
+
+    parser = IncrementalObjectParser()
+    async for chunk in response:
+        parser.feed(chunk.text)
+        if parser.done or all(key in parser.members for key in ANALYSIS_KEYS):
+            break
+
+    missing = [key for key in ANALYSIS_KEYS if key not in parser.members]
+    if missing:
+        raise ValueError(f"Streamed analysis is missing {missing}")
+    return parser.members
+
+def _parse_simulation(raw_text: str) -> str | dict:
+    if SIMULATION_FORMAT == "keyframes":
         json_start = raw_text.find('{')
         json_end = raw_text.rfind('}') + 1
-        clean_json_string = raw_text[json_start:json_end]
-        return json.loads(clean_json_string)
-    except (json.JSONDecodeError, ValueError) as e:
-        print(f"Error parsing JSON from model response: {e}")
+        scene = SimulationScene.model_validate_json(raw_text[json_start:json_end])
+        return scene.model_dump(mode='json')
+
+    html = raw_text.strip().replace("```html", "").replace("```", "").strip()
+    if "<html" not in html.lower():
+        raise ValueError("Model response is not an HTML document")
+    return html
+
+async def generate_simulation(video_url: str, report_key: str) -> str | dict:
+    """
+    Returns the simulation HTML, or the scene JSON when SIMULATION_FORMAT is "keyframes".
+    """
+    _, scenario = SIMULATIONS[report_key]
+    template = SIMULATION_SCENE_PROMPT if SIMULATION_FORMAT == "keyframes" else SIMULATION_PROMPT
+    prompt = template.format(video_url=video_url, scenario=scenario)
+
+    last_error = None
+    for attempt in range(MAX_SIMULATION_ATTEMPTS):
+        try:
+            response = await gemini_pro_model.generate_content_async(prompt)
+            return _parse_simulation(response.text)
+        except Exception as e:
+            print(f"Simulation {report_key} attempt {attempt + 1} failed: {e}")
+            last_error = e
+
+    raise last_error
+
+def simulation_fields(report_key: str, result: str | dict | None) -> dict:
+    """
+    Maps a generated simulation onto Incident fields: a scene goes in the matching scene
+    field, HTML is moved to blob storage and referenced. The html field itself stays empty.
+    Uploads to Storage, so call it off the event loop.
+    """
+    html_field, _ = SIMULATIONS[report_key]
+    if isinstance(result, dict):
+        return {html_field: "", SCENE_FIELDS[html_field]: result}
+    return externalize_simulations({html_field: result or ""})
+
+async def process_video_and_generate_simulations(video_url: str) -> dict:
+    # the analysis and both simulations are independent, so latency is the slowest call instead of the sum
+    results = await asyncio.gather(
+        generate_incident_analysis(video_url),
+        *(generate_simulation(video_url, report_key) for report_key in SIMULATIONS),
+        return_exceptions=True
+    )
+    analysis, simulation_results = results[0], results[1:]
+
+    if isinstance(analysis, Exception):
+        print(f"Error generating incident analysis: {analysis}")
         return {} # Return empty dict on failure
 
-def save_incident_report(user_id: str, video_url: str, full_report_data: dict) -> dict:
+    report = {"analysis": analysis, "failed_simulations": []}
+    for report_key, result in zip(SIMULATIONS, simulation_results):
+        if isinstance(result, Exception):
+            # keep the analysis; the simulation can be regenerated later on its own
+            report[report_key] = ""
+            report["failed_simulations"].append(SIMULATIONS[report_key][0])
+        else:
+            report[report_key] = result
+
+    return report
+
+async def regenerate_failed_simulations(incident_data: dict) -> dict:
+    """
+    Retries the simulations an incident is missing. Returns the fields to update on the incident.
+    """
+    updates = {}
+    still_failed = []
+
+    for report_key, (field, _) in SIMULATIONS.items():
+        if field not in incident_data.get("failed_simulations", []):
+            continue
+        try:
+            result = await generate_simulation(incident_data["video_url"], report_key)
+            updates.update(await asyncio.to_thread(simulation_fields, report_key, result))
+        except Exception:
+            still_failed.append(field)
+
+    updates["failed_simulations"] = still_failed
+    return updates
+
+def store_incident_report(user_id: str, video_url: str, full_report_data: dict) -> dict:
     incident_id = str(uuid.uuid4())
     
     analysis_data = full_report_data.get("analysis", {})
@@ -61,8 +226,10 @@ def save_incident_report(user_id: str, video_url: str, full_report_data: dict) -
         incident_summary=analysis_data.get("incident_summary"),
         severity=analysis_data.get("severity"),
         quiz=analysis_data.get("better_action_quiz"),
-        simulation_html=full_report_data.get("simulation_actual_html"),
-        simulation_better_html=full_report_data.get("simulation_better_outcome_html")
+        failed_simulations=full_report_data.get("failed_simulations", []),
+        pending_simulations=full_report_data.get("pending_simulations", []),
+        **simulation_fields("simulation_actual_html", full_report_data.get("simulation_actual_html")),
+        **simulation_fields("simulation_better_outcome_html", full_report_data.get("simulation_better_outcome_html"))
     )
     
     incident_dict = incident_data.model_dump(mode='json')
@@ -75,5 +242,9 @@ def save_incident_report(user_id: str, video_url: str, full_report_data: dict) -
     # Return the Firestore-compatible dictionary
     return incident_dict
 
+async def save_incident_report(user_id: str, video_url: str, full_report_data: dict) -> dict:
+    # the ADK calls sync tools on the event loop, and saving uploads to Storage and writes to Firestore
+    return await asyncio.to_thread(store_incident_report, user_id, video_url, full_report_data)
+
 processing_tool = FunctionTool(func=process_video_and_generate_simulations)
 save_report_tool = FunctionTool(func=save_incident_report)
\ No newline at end of file
@@ -1,6 +1,14 @@
 import json
 from core.gemini_setup import gemini_flash_model, gemini_pro_model
 from schemas.quiz import QuizInDB
+from services.topic_index import TopicIndex, DUPLICATE_SIMILARITY
+
+# only the most recent excluded topics go into a prompt, so its size doesn't grow with
+# history; near-duplicates of older ones are rejected afterwards by TopicIndex
+MAX_PROMPT_TOPICS = 20
+
+def _prompt_topics(excluded_topics: list) -> str:
+    return ", ".join(f'"{topic}"' for topic in excluded_topics[-MAX_PROMPT_TOPICS:])
 
 def generate_quiz_from_topic(topic: str, experience: str) -> dict:
     prompt = f"""
@@ -45,7 +53,7 @@ def generate_quiz_from_topic(topic: str, experience: str) -> dict:
         return None
       
 def generate_new_quiz_with_new_topic(experience: str, excluded_topics: list) -> dict:
-    excluded_topics_str = ", ".join(f'"{topic}"' for topic in excluded_topics)
+    excluded_topics_str = _prompt_topics(excluded_topics)
 
     prompt = f"""
     You are a driving instructor creating a quiz for a driver with {experience} experience.
@@ -76,3 +84,85 @@ def generate_new_quiz_with_new_topic(experience: str, excluded_topics: list) ->
     except Exception as e:
         print(f"Error generating new dynamic quiz: {e}")
         return None
+
+# quizzes per batch call; bigger batches risk a truncated response
+MAX_QUIZ_BATCH_SIZE = 5
+MAX_BATCH_ATTEMPTS = 2
+
+def _generate_quiz_batch(experience: str, excluded_topics: list, count: int) -> list:
+    excluded_topics_str = _prompt_topics(excluded_topics)
+
+    prompt = f"""
+    You are a driving instructor creating quizzes for a driver with {experience} experience.
+
+    Your first task is to invent {count} new, specific driving-related quiz topics. Every topic MUST be different from the others and MUST NOT be any of the following: [{excluded_topics_str}]. Good examples are "Handling Tire Blowouts", "Navigating Roundabouts", or "Understanding Dashboard Warning Lights".
+
+    Your second task is to generate a 5-question quiz for each topic you invented. Include at least one true/false question per quiz and use "All of the above" sparingly.
+
+    Your final output MUST be a single, valid JSON array with exactly {count} quiz objects. Do not include any other text, just the JSON. Each quiz object must follow this exact format:
+    {{
+      "topic": "The New Topic You Invented",
+      "questions": [
+        {{
+          "question_text": "...",
+          "question_type": "multiple_choice",
+          "options": ["...", "...", "...", "..."],
+          "correct_answer_index": 0
+        }}
+      ]
+    }}
+    """
+    response = gemini_flash_model.generate_content(prompt)
+    cleaned_response = response.text.strip().replace("```json", "").replace("```", "")
+    quizzes = json.loads(cleaned_response[cleaned_response.find('['):cleaned_response.rfind(']') + 1])
+    if not isinstance(quizzes, list):
+        raise ValueError("Model response is not a JSON array")
+    return quizzes
+
+def generate_new_quizzes_with_new_topics(experience: str, excluded_topics: list, count: int) -> list:
+    """
+    Generates up to count quizzes on distinct new topics, several per model call. Each quiz
+    is validated on its own, and near-duplicates of excluded_topics are rejected, so one bad
+    quiz doesn't cost the rest of the batch; only the missing ones are asked for again, and
+    whatever is still missing after that falls back to one call per quiz.
+    """
+    excluded = list(excluded_topics)
+    index = TopicIndex(excluded)
+    quizzes = []
+
+    def accept(quiz_data) -> bool:
+        try:
+            QuizInDB(**quiz_data)
+        except Exception as e:
+            print(f"Discarding invalid quiz from batch: {e}")
+            return False
+        similar_topic, score = index.most_similar(quiz_data["topic"])
+        if score >= DUPLICATE_SIMILARITY:
+            print(f"Discarding quiz on \"{quiz_data['topic']}\", too close to \"{similar_topic}\"")
+            return False
+        quizzes.append(quiz_data)
+        excluded.append(quiz_data["topic"])
+        index.add(quiz_data["topic"])
+        return True
+
+    # a batch that comes back short counts as a failed attempt
+    failed_batches = 0
+    while len(quizzes) < count and failed_batches < MAX_BATCH_ATTEMPTS:
+        batch_size = min(count - len(quizzes), MAX_QUIZ_BATCH_SIZE)
+        try:
+            batch = _generate_quiz_batch(experience, excluded, batch_size)
+        except Exception as e:
+            print(f"Error generating quiz batch: {e}")
+            failed_batches += 1
+            continue
+        accepted = sum(accept(quiz_data) for quiz_data in batch[:batch_size])
+        if accepted < batch_size:
+            failed_batches += 1
+
+    # fall back to the single-quiz prompt for whatever the batches didn't produce
+    for _ in range(count - len(quizzes)):
+        quiz_data = generate_new_quiz_with_new_topic(experience, excluded)
+        if quiz_data:
+            accept(quiz_data)
+
+    return quizzes
@@ -0,0 +1,112 @@
+import asyncio
+import base64
+import json
+from datetime import datetime, timezone
+from fastapi import HTTPException, status
+from google.cloud.firestore_v1.base_query import FieldFilter
+from firebase_admin import firestore
+from core.firebase_setup import async_db
+from schemas.incident import IncidentFilters, SeverityLevel, IncidentStatus
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# fields read for the summary view; Firestore select() skips everything else server-side
+SUMMARY_FIELDS = ["incident_id", "status", "created_at", "incident_summary", "severity", "video_url"]
+
+def encode_cursor(incident_data: dict, incident_id: str) -> str:
+    payload = json.dumps([incident_data.get("created_at"), incident_id])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+def decode_cursor(cursor: str) -> dict:
+    try:
+        created_at, incident_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid start_after cursor")
+    return {"created_at": created_at, "__name__": incident_id}
+
+def _timestamp(value: datetime) -> str:
+    # created_at is stored as a naive ISO string, so compare against the same format
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.isoformat()
+
+def _user_query(uid: str, filters: IncidentFilters | None = None):
+    query = async_db.collection('incidents').where(filter=FieldFilter('user_id', '==', uid))
+    if filters is None:
+        return query
+
+    # every combination of the equality filters below has a composite index in firestore.indexes.json
+    if filters.severity is not None:
+        query = query.where(filter=FieldFilter('severity', '==', filters.severity.value))
+    if filters.status is not None:
+        query = query.where(filter=FieldFilter('status', '==', filters.status.value))
+    if filters.quiz_answered is not None:
+        query = query.where(filter=FieldFilter('quiz_answered', '==', filters.quiz_answered))
+    if filters.created_after is not None:
+        query = query.where(filter=FieldFilter('created_at', '>=', _timestamp(filters.created_after)))
+    if filters.created_before is not None:
+        query = query.where(filter=FieldFilter('created_at', '<', _timestamp(filters.created_before)))
+    return query
+
+async def list_user_incidents(
+    uid: str,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    start_after: str | None = None,
+    summary: bool = False,
+    filters: IncidentFilters | None = None
+) -> tuple[list[dict], str | None]:
+    """
+    Returns one page of the user's incidents, newest first, and the cursor for the next page.
+    Needs the composite indexes in firestore.indexes.json.
+    """
+    # order by document id as well so incidents created at the same instant page stably
+    query = _user_query(uid, filters) \
+        .order_by('created_at', direction=firestore.Query.DESCENDING) \
+        .order_by('__name__', direction=firestore.Query.DESCENDING)
+
+    if summary:
+        query = query.select(SUMMARY_FIELDS)
+    if start_after:
+        query = query.start_after(decode_cursor(start_after))
+
+    # one extra document tells us whether there is another page
+    docs = [doc async for doc in query.limit(page_size + 1).stream()]
+    page = docs[:page_size]
+
+    items = [doc.to_dict() for doc in page]
+    next_cursor = encode_cursor(items[-1], page[-1].id) if len(docs) > page_size else None
+    return items, next_cursor
+
+async def _count(query) -> int:
+    # aggregation query: billed as one read per 1000 matching index entries, no documents are sent
+    result = await query.count(alias="total").get()
+    return int(result[0][0].value)
+
+async def count_user_incidents(uid: str, created_after: datetime | None = None, created_before: datetime | None = None) -> dict:
+    """
+    Counts the user's incidents by severity and status with count() aggregations.
+    The counts run concurrently, so this costs a handful of reads and one round-trip of latency.
+    """
+    def counted(**filter_values):
+        filters = IncidentFilters(created_after=created_after, created_before=created_before, **filter_values)
+        return _count(_user_query(uid, filters))
+
+    severities = list(SeverityLevel)
+    statuses = list(IncidentStatus)
+    counts = await asyncio.gather(
+        counted(),
+        counted(quiz_answered=True),
+        *(counted(severity=severity) for severity in severities),
+        *(counted(status=incident_status) for incident_status in statuses)
+    )
+
+    total, answered = counts[0], counts[1]
+    severity_counts = counts[2:2 + len(severities)]
+    status_counts = counts[2 + len(severities):]
+    return {
+        "total": total,
+        "by_severity": dict(zip(severities, severity_counts)),
+        "by_status": dict(zip(statuses, status_counts)),
+        "quiz_answered": answered
+    }
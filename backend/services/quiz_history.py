@@ -0,0 +1,101 @@
+import base64
+import json
+from datetime import datetime
+from fastapi import HTTPException, status
+from firebase_admin import firestore
+from core.firebase_setup import db
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# fields read for the summary view; the questions and per-question results are skipped
+SUMMARY_FIELDS = ["topic", "completed_at", "final_score"]
+
+def _completions_ref(uid: str):
+    return db.collection('users').document(uid).collection('quiz_completions')
+
+def quiz_stats_ref(uid: str):
+    # running aggregates over the user's completions, kept up to date by submit_quiz_transactional
+    return db.collection('users').document(uid).collection('quiz_meta').document('stats')
+
+def encode_cursor(completion_data: dict, quiz_id: str) -> str:
+    payload = json.dumps([completion_data["completed_at"].isoformat(), quiz_id])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+def decode_cursor(cursor: str) -> dict:
+    try:
+        completed_at, quiz_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        completed_at = datetime.fromisoformat(completed_at)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid start_after cursor")
+    return {"completed_at": completed_at, "__name__": quiz_id}
+
+def list_quiz_history(uid: str, page_size: int = DEFAULT_PAGE_SIZE, start_after: str | None = None, summary: bool = False) -> tuple[list[tuple[str, dict]], str | None]:
+    """
+    Returns one page of (quiz_id, completion) pairs, newest first, and the cursor for the next page.
+    """
+    query = _completions_ref(uid) \
+        .order_by('completed_at', direction=firestore.Query.DESCENDING) \
+        .order_by('__name__', direction=firestore.Query.DESCENDING)
+
+    if summary:
+        query = query.select(SUMMARY_FIELDS)
+    if start_after:
+        query = query.start_after(decode_cursor(start_after))
+
+    # one extra document tells us whether there is another page
+    docs = list(query.limit(page_size + 1).stream())
+    page = docs[:page_size]
+
+    items = [(doc.id, doc.to_dict()) for doc in page]
+    next_cursor = encode_cursor(items[-1][1], page[-1].id) if len(docs) > page_size else None
+    return items, next_cursor
+
+def add_completion_to_stats(stats_data: dict, final_score: float, topic: str | None, streak: int) -> dict:
+    attempts = stats_data.get("attempts", 0) + 1
+    total_score = stats_data.get("total_score", 0.0) + final_score
+    attempts_by_topic = dict(stats_data.get("attempts_by_topic", {}))
+    if topic:
+        attempts_by_topic[topic] = attempts_by_topic.get(topic, 0) + 1
+
+    return {
+        **stats_data,
+        "attempts": attempts,
+        "total_score": total_score,
+        "average_score": round(total_score / attempts, 2),
+        "best_score": max(stats_data.get("best_score", 0.0), final_score),
+        "attempts_by_topic": attempts_by_topic,
+        "best_streak": max(stats_data.get("best_streak", 0), streak)
+    }
+
+@firestore.transactional
+def _rebuild_quiz_stats(transaction: firestore.Transaction, uid: str) -> dict:
+    # runs in a transaction so a quiz submitted mid-rebuild makes this retry instead of being overwritten
+    stats_doc = quiz_stats_ref(uid).get(transaction=transaction)
+    stats_data = stats_doc.to_dict() if stats_doc.exists else {}
+    if stats_data.get("backfilled"):
+        return stats_data
+
+    user_doc = db.collection('users').document(uid).get(transaction=transaction)
+    current_streak = user_doc.to_dict().get("daily_quiz_streak", 0) if user_doc.exists else 0
+
+    rebuilt = {"best_streak": max(stats_data.get("best_streak", 0), current_streak)}
+    for doc in transaction.get(_completions_ref(uid).select(["topic", "final_score"])):
+        completion_data = doc.to_dict()
+        rebuilt = add_completion_to_stats(rebuilt, completion_data.get("final_score", 0.0), completion_data.get("topic"), 0)
+
+    rebuilt["backfilled"] = True
+    transaction.set(quiz_stats_ref(uid), rebuilt)
+    return rebuilt
+
+def get_quiz_stats(uid: str) -> dict:
+    """
+    Reads the stats doc. Users who completed quizzes before it existed get it rebuilt from
+    their history once; best_streak then starts from their current streak.
+    """
+    stats_doc = quiz_stats_ref(uid).get()
+    stats_data = stats_doc.to_dict() if stats_doc.exists else {}
+    if stats_data.get("backfilled"):
+        return stats_data
+
+    return _rebuild_quiz_stats(db.transaction(), uid)
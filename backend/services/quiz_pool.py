@@ -0,0 +1,136 @@
+import os
+import random
+import threading
+from datetime import datetime
+from dotenv import load_dotenv
+from firebase_admin import firestore
+from google.cloud.firestore_v1.base_query import FieldFilter
+from core.firebase_setup import db
+from schemas.quiz import QuizInDB
+from services.gemini_service import generate_new_quizzes_with_new_topics
+from services.topic_index import TopicIndex
+
+load_dotenv()
+
+# pre-generated quizzes, so /quiz/active never waits on the model
+QUIZ_POOL_LEVELS = [level.strip() for level in os.getenv("QUIZ_POOL_LEVELS", "Intermediate").split(",") if level.strip()]
+# refill a level once its stock drops below the low-water mark, up to the target
+QUIZ_POOL_LOW_WATER = int(os.getenv("QUIZ_POOL_LOW_WATER", 10))
+QUIZ_POOL_TARGET = int(os.getenv("QUIZ_POOL_TARGET", 25))
+QUIZ_POOL_REFILL_MINUTES = int(os.getenv("QUIZ_POOL_REFILL_MINUTES", 10))
+# how many pooled quizzes a claim looks at to find topics the user hasn't seen; every one
+# of them is locked by the claim transaction, so keep it small
+CLAIM_SCAN_LIMIT = 20
+
+pool_collection = db.collection('quiz_pool')
+
+# the scheduler and request-triggered refills share this so only one refill runs at a time
+_refill_lock = threading.Lock()
+
+def _level_query(experience: str):
+    return pool_collection.where(filter=FieldFilter('experience', '==', experience))
+
+def add_to_pool(experience: str, quiz_data: dict) -> str:
+    quiz = QuizInDB(**quiz_data)
+    doc_ref = pool_collection.document()
+    doc_ref.set({
+        **quiz.model_dump(mode='json'),
+        "experience": experience,
+        "created_at": datetime.now(),
+        # claims start scanning at a random shard so concurrent claims lock different quizzes
+        "shard": random.random()
+    })
+    return doc_ref.id
+
+def _backfill_shards(pooled_docs: list):
+    # quizzes pooled before sharding have no shard and would never be claimed
+    missing = [doc for doc in pooled_docs if doc.to_dict().get("shard") is None]
+    if not missing:
+        return
+    batch = db.batch()
+    for doc in missing:
+        batch.update(doc.reference, {"shard": random.random()})
+    batch.commit()
+
+def _refill_level(experience: str, excluded_topics: list[str]) -> int:
+    # the level is small (at most QUIZ_POOL_TARGET), so read it whole rather than count it
+    pooled_docs = list(_level_query(experience).select(["topic", "created_at", "shard"]).stream())
+    _backfill_shards(pooled_docs)
+
+    stock = len(pooled_docs)
+    if stock >= QUIZ_POOL_LOW_WATER:
+        return 0
+
+    # don't stock two quizzes on the same topic for a level; newest last, since prompts only
+    # carry the most recent excluded topics
+    pooled = [doc.to_dict() for doc in pooled_docs]
+    pooled.sort(key=lambda quiz_data: quiz_data.get("created_at") or datetime.min)
+    excluded = list(excluded_topics) + [quiz_data["topic"] for quiz_data in pooled if quiz_data.get("topic")]
+
+    quizzes = generate_new_quizzes_with_new_topics(experience, excluded, QUIZ_POOL_TARGET - stock)
+    for quiz_data in quizzes:
+        add_to_pool(experience, quiz_data)
+    return len(quizzes)
+
+def refill_quiz_pool(excluded_topics: list[str] | None = None) -> dict:
+    """
+    Tops up every level in QUIZ_POOL_LEVELS that is below the low-water mark. Blocks on
+    the model, so it runs from the scheduler or a background task, never inside a request.
+    Returns the number of quizzes added per level.
+    """
+    if not _refill_lock.acquire(blocking=False):
+        return {}
+
+    try:
+        added = {}
+        for experience in QUIZ_POOL_LEVELS:
+            try:
+                added[experience] = _refill_level(experience, excluded_topics or [])
+            except Exception as e:
+                print(f"Error refilling quiz pool for {experience}: {e}")
+        if any(added.values()):
+            print(f"Quiz pool refilled: {added}")
+        return added
+    finally:
+        _refill_lock.release()
+
+@firestore.transactional
+def _claim_transactional(transaction: firestore.Transaction, experience: str, count: int, excluded_topics: list[str]) -> list[dict]:
+    # scan from a random shard, wrapping around to the start of the level if the tail is short;
+    # a fixed scan would make every concurrent claim lock the same quizzes
+    start = random.random()
+    docs = list(transaction.get(
+        _level_query(experience).where(filter=FieldFilter('shard', '>=', start)).order_by('shard').limit(CLAIM_SCAN_LIMIT)
+    ))
+    if len(docs) < CLAIM_SCAN_LIMIT:
+        # all reads come before the deletes below; a transaction can't read after writing
+        docs += transaction.get(
+            _level_query(experience).where(filter=FieldFilter('shard', '<', start)).order_by('shard').limit(CLAIM_SCAN_LIMIT - len(docs))
+        )
+
+    # built per attempt, since a retried transaction must not remember the last attempt's claims
+    index = TopicIndex(excluded_topics)
+
+    claimed = []
+    for doc in docs:
+        quiz_data = doc.to_dict()
+        if index.is_near_duplicate(quiz_data.get("topic", "")):
+            continue
+
+        transaction.delete(doc.reference)
+        claimed.append({"topic": quiz_data["topic"], "questions": quiz_data["questions"]})
+        index.add(quiz_data["topic"])
+        if len(claimed) == count:
+            break
+
+    return claimed
+
+def claim_quizzes(experience: str, count: int, excluded_topics: list[str]) -> list[dict]:
+    """
+    Takes up to count pooled quizzes whose topics aren't near-duplicates of excluded_topics,
+    removing them from the pool in a transaction so two users never get the same one. May
+    return fewer when the pool runs low; the caller should schedule a refill.
+    """
+    if count <= 0:
+        return []
+    return _claim_transactional(db.transaction(), experience, count, excluded_topics)
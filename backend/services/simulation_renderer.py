@@ -0,0 +1,39 @@
+import json
+import os
+from functools import lru_cache
+from schemas.simulation import SimulationScene
+
+TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "templates", "simulation.html")
+SCENE_PLACEHOLDER = "__SCENE_JSON__"
+
+# Incident html field -> the scene it is rendered from
+SCENE_FIELDS = {
+    "simulation_html": "simulation_scene",
+    "simulation_better_html": "simulation_better_scene",
+}
+
+@lru_cache(maxsize=1)
+def _template_parts() -> tuple[str, str]:
+    # read and split once per process; rendering is then just two concatenations
+    with open(TEMPLATE_PATH, encoding="utf-8") as template_file:
+        template = template_file.read()
+    head, tail = template.split(SCENE_PLACEHOLDER)
+    return head, tail
+
+def render_simulation(scene: SimulationScene | dict) -> str:
+    if isinstance(scene, dict):
+        scene = SimulationScene.model_validate(scene)
+
+    # "</" would end the inline <script> early
+    scene_json = json.dumps(scene.model_dump(mode='json')).replace("</", "<\\/")
+    head, tail = _template_parts()
+    return head + scene_json + tail
+
+def with_rendered_simulations(incident_data: dict) -> dict:
+    """
+    Fills in the html fields of an incident stored in the keyframe format.
+    """
+    for html_field, scene_field in SCENE_FIELDS.items():
+        if incident_data.get(scene_field) and not incident_data.get(html_field):
+            incident_data[html_field] = render_simulation(incident_data[scene_field])
+    return incident_data
@@ -0,0 +1,64 @@
+import gzip
+import hashlib
+from functools import lru_cache
+from google.api_core.exceptions import PreconditionFailed
+from core.firebase_setup import bucket
+from schemas.simulation import SimulationRef
+from services.simulation_renderer import with_rendered_simulations
+
+SIMULATIONS_PREFIX = "simulations/"
+
+# Incident html field -> the blob reference that replaces it
+REF_FIELDS = {
+    "simulation_html": "simulation_ref",
+    "simulation_better_html": "simulation_better_ref",
+}
+
+def store_simulation(html: str) -> SimulationRef:
+    """
+    Stores gzipped simulation HTML under the SHA-256 of its content, so identical
+    simulations (e.g. from the analysis cache) share one blob.
+    """
+    raw = html.encode("utf-8")
+    compressed = gzip.compress(raw)
+    blob_name = f"{SIMULATIONS_PREFIX}{hashlib.sha256(raw).hexdigest()}.html.gz"
+
+    blob = bucket.blob(blob_name)
+    try:
+        # only upload if the blob isn't there yet; same name means same content
+        blob.upload_from_string(compressed, content_type="application/gzip", if_generation_match=0)
+    except PreconditionFailed:
+        pass
+
+    return SimulationRef(blob_name=blob_name, size=len(raw), compressed_size=len(compressed))
+
+@lru_cache(maxsize=32)
+def _load_simulation(blob_name: str) -> str:
+    # blobs are content-addressed and never change, so caching them is always safe
+    return gzip.decompress(bucket.blob(blob_name).download_as_bytes()).decode("utf-8")
+
+def load_simulation(ref: SimulationRef | dict) -> str:
+    blob_name = ref.blob_name if isinstance(ref, SimulationRef) else ref["blob_name"]
+    return _load_simulation(blob_name)
+
+def externalize_simulations(incident_data: dict) -> dict:
+    """
+    Moves any inline simulation HTML of an incident dict into blob storage,
+    leaving a reference and an empty html field behind.
+    """
+    for html_field, ref_field in REF_FIELDS.items():
+        html = incident_data.get(html_field)
+        if html:
+            incident_data[ref_field] = store_simulation(html).model_dump()
+            incident_data[html_field] = ""
+    return incident_data
+
+def with_simulations(incident_data: dict) -> dict:
+    """
+    Fills in the html fields of an incident for callers that display it,
+    from blob storage or by rendering its keyframe scenes.
+    """
+    for html_field, ref_field in REF_FIELDS.items():
+        if incident_data.get(ref_field) and not incident_data.get(html_field):
+            incident_data[html_field] = load_simulation(incident_data[ref_field])
+    return with_rendered_simulations(incident_data)
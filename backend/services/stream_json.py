@@ -0,0 +1,97 @@
+import json
+
+class IncrementalObjectParser:
+    """
+    Parses a JSON object that arrives in chunks (e.g. a streamed model response) and
+    hands back each top-level member as soon as its value is complete, instead of
+    waiting for the closing brace. Text before the opening brace, such as a
+    ```json fence, is ignored.
+    """
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        # what the next token at depth 1 should be: "key", "colon", "value" or "comma"
+        self._expect = "key"
+        self._key_start = None
+        self._key = None
+        self._value_start = None
+        self._scalar = False
+        self.done = False
+        self.members = {}
+
+    def _complete_member(self, value_text: str) -> tuple[str, object]:
+        value = json.loads(value_text)
+        self.members[self._key] = value
+        member = (self._key, value)
+        self._value_start = None
+        self._scalar = False
+        self._expect = "comma"
+        return member
+
+    def feed(self, chunk: str) -> list[tuple[str, object]]:
+        """
+        Adds a chunk of text and returns the (key, value) members completed by it.
+        """
+        self._buffer += chunk
+        completed = []
+
+        while self._pos < len(self._buffer) and not self.done:
+            i = self._pos
+            c = self._buffer[i]
+            self._pos += 1
+
+            if self._depth == 0:
+                if c == "{":
+                    self._depth = 1
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._expect == "key":
+                        self._key = json.loads(self._buffer[self._key_start:i + 1])
+                        self._expect = "colon"
+                    elif self._depth == 1 and self._value_start is not None:
+                        completed.append(self._complete_member(self._buffer[self._value_start:i + 1]))
+                continue
+
+            # a bare scalar (number, true, false, null) ends at the next delimiter
+            if self._scalar and c in ",}":
+                completed.append(self._complete_member(self._buffer[self._value_start:i].strip()))
+
+            if c == '"':
+                self._in_string = True
+                if self._depth == 1 and self._expect == "key":
+                    self._key_start = i
+                elif self._depth == 1 and self._expect == "value":
+                    self._value_start = i
+                    self._expect = "in_value"
+            elif c in "{[":
+                if self._depth == 1 and self._expect == "value":
+                    self._value_start = i
+                    self._expect = "in_value"
+                self._depth += 1
+            elif c in "}]":
+                self._depth -= 1
+                if self._depth == 1 and self._value_start is not None:
+                    completed.append(self._complete_member(self._buffer[self._value_start:i + 1]))
+                elif self._depth == 0:
+                    self.done = True
+            elif self._depth == 1:
+                if c == ":":
+                    self._expect = "value"
+                elif c == ",":
+                    self._expect = "key"
+                elif not c.isspace() and self._expect == "value":
+                    self._value_start = i
+                    self._scalar = True
+                    self._expect = "in_value"
+
+        return completed
@@ -0,0 +1,85 @@
+import hashlib
+import re
+import numpy as np
+
+# words that say nothing about what a quiz covers ("Navigating Roundabouts" is about roundabouts)
+GENERIC_WORDS = {
+    "a", "an", "and", "at", "for", "in", "into", "of", "on", "onto", "or", "the", "to", "your", "with", "while", "when",
+    "driving", "driver", "drivers", "rules", "basics", "understanding", "navigating", "handling",
+    "safe", "safety", "tips", "proper"
+}
+NGRAM_SIZE = 3
+NUM_PERMUTATIONS = 128
+# estimated Jaccard similarity of the two topics' n-gram sets
+DUPLICATE_SIMILARITY = 0.6
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_rng = np.random.default_rng(20240601)
+_PERM_A = _rng.integers(1, 1 << 32, size=NUM_PERMUTATIONS, dtype=np.uint64)
+_PERM_B = _rng.integers(0, 1 << 32, size=NUM_PERMUTATIONS, dtype=np.uint64)
+
+def topic_ngrams(topic: str) -> set[str]:
+    words = [word for word in re.findall(r"[a-z0-9]+", topic.lower()) if word not in GENERIC_WORDS]
+    # a topic made only of generic words is still compared on those words
+    if not words:
+        words = re.findall(r"[a-z0-9]+", topic.lower())
+    grams = set()
+    for word in words:
+        # fold simple plurals so "Roundabout" matches "Roundabouts"
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        padded = f" {word} "
+        grams.update(padded[i:i + NGRAM_SIZE] for i in range(max(1, len(padded) - NGRAM_SIZE + 1)))
+    return grams
+
+def minhash_signature(grams: set[str]) -> np.ndarray:
+    if not grams:
+        return np.full(NUM_PERMUTATIONS, np.iinfo(np.uint64).max, dtype=np.uint64)
+    # 32-bit hashes keep a * hash + b below 2**64; crc32 is too linear for min-wise hashing
+    hashes = np.array(
+        [int.from_bytes(hashlib.blake2b(gram.encode(), digest_size=4).digest(), "little") for gram in grams],
+        dtype=np.uint64
+    )
+    # one row per n-gram, one column per permutation; the signature is the column minimum
+    permuted = (hashes[:, None] * _PERM_A[None, :] + _PERM_B[None, :]) % _MERSENNE_PRIME
+    return permuted.min(axis=0)
+
+class TopicIndex:
+    """
+    MinHash index over quiz topics for catching near-duplicates such as "Roundabouts"
+    and "Navigating Roundabouts". A query is compared against every stored topic in one
+    vectorized step.
+    """
+    def __init__(self, topics=()):
+        self.topics: list[str] = []
+        self._signatures = np.empty((0, NUM_PERMUTATIONS), dtype=np.uint64)
+        self.add_all(topics)
+
+    def __len__(self) -> int:
+        return len(self.topics)
+
+    def add_all(self, topics):
+        topics = [topic for topic in topics if topic]
+        if not topics:
+            return
+        signatures = np.array([minhash_signature(topic_ngrams(topic)) for topic in topics])
+        self.topics.extend(topics)
+        self._signatures = np.vstack([self._signatures, signatures])
+
+    def add(self, topic: str):
+        self.add_all([topic])
+
+    def most_similar(self, topic: str) -> tuple[str | None, float]:
+        """
+        Returns the closest stored topic and its estimated similarity between 0 and 1.
+        """
+        if not self.topics:
+            return None, 0.0
+        # the share of matching signature slots estimates the Jaccard similarity
+        similarity = (self._signatures == minhash_signature(topic_ngrams(topic))).mean(axis=1)
+        best = int(similarity.argmax())
+        return self.topics[best], float(similarity[best])
+
+    def is_near_duplicate(self, topic: str, threshold: float = DUPLICATE_SIMILARITY) -> bool:
+        _, score = self.most_similar(topic)
+        return score >= threshold
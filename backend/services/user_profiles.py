@@ -0,0 +1,48 @@
+import os
+from dotenv import load_dotenv
+from core.cache import TTLCache
+from core.firebase_setup import db, async_db
+
+load_dotenv()
+
+# profiles are read on most page loads but change rarely; writers in this process keep the
+# cache current, and the TTL bounds staleness from writes in other worker processes
+USER_PROFILE_CACHE_TTL_SEC = int(os.getenv("USER_PROFILE_CACHE_TTL_SEC", 60))
+USER_PROFILE_CACHE_SIZE = int(os.getenv("USER_PROFILE_CACHE_SIZE", 1000))
+
+profile_cache = TTLCache(ttl_sec=USER_PROFILE_CACHE_TTL_SEC, maxsize=USER_PROFILE_CACHE_SIZE)
+
+def _load_profile(uid: str) -> dict | None:
+    user_doc = db.collection('users').document(uid).get()
+    return user_doc.to_dict() if user_doc.exists else None
+
+def get_user_profile(uid: str) -> dict | None:
+    # callers get a copy so they can't change the cached profile
+    profile = profile_cache.get_or_load(uid, lambda: _load_profile(uid))
+    return dict(profile) if profile is not None else None
+
+async def _load_profile_async(uid: str) -> dict | None:
+    user_doc = await async_db.collection('users').document(uid).get()
+    return user_doc.to_dict() if user_doc.exists else None
+
+async def get_user_profile_async(uid: str) -> dict | None:
+    profile = await profile_cache.get_or_load_async(uid, lambda: _load_profile_async(uid))
+    return dict(profile) if profile is not None else None
+
+def update_user_profile(uid: str, fields: dict) -> dict | None:
+    """
+    Writes the fields and returns the updated profile. When the profile is cached the
+    written fields are applied to it, so no second read is needed.
+    """
+    db.collection('users').document(uid).update(fields)
+
+    cached = profile_cache.get(uid)
+    if cached is None:
+        return get_user_profile(uid)
+
+    updated = {**cached, **fields}
+    profile_cache.set(uid, updated)
+    return dict(updated)
+
+def invalidate_user_profile(uid: str):
+    profile_cache.invalidate(uid)
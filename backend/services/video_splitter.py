@@ -1,40 +1,273 @@
 import cv2
+import numpy as np
 import os
+import sys
+from typing import Sequence
 
-def process_video_to_screenshots(source_path: str, output_dir: str, interval_sec: int = 1) -> list[str]:
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
+# gaps shorter than this (in frames) are skipped with grab() instead of a seek,
+# since a seek makes the decoder restart from the previous keyframe anyway
+SEEK_MIN_GAP_FRAMES = 15
 
-    video_data = cv2.VideoCapture(source_path)
-    if not video_data.isOpened():
-        print("Error: Couldn't open video...")
-        return []
+# parallel extraction: a clip gets one decoding worker per this many seconds of video,
+# so short clips stay on a single worker and skip the fan-out overhead
+PARALLEL_MIN_SEGMENT_SEC = int(os.getenv("VIDEO_SPLITTER_MIN_SEGMENT_SEC", 60))
+
+JPEG_QUALITY = 90
 
-    fps = video_data.get(cv2.CAP_PROP_FPS)
+# adaptive selection: motion is scored on small grayscale thumbnails sampled at
+# MOTION_ANALYSIS_FPS, then the frame budget is spread in proportion to motion
+ADAPTIVE_FRAME_BUDGET = int(os.getenv("VIDEO_SPLITTER_FRAME_BUDGET", 30))
+MOTION_ANALYSIS_FPS = 5
+MOTION_THUMBNAIL_SIZE = (64, 36)
+# share of the budget spread evenly so quiet stretches still get a few frames
+MOTION_BASELINE_SHARE = 0.2
+
+# dedup: frames whose 64-bit dHash is within this many bits of the last kept frame are dropped
+DEDUP_HAMMING_THRESHOLD = 5
+
+def _target_frame_indices(fps: float, frame_total: int, interval_sec: int) -> range:
     # calculates how many frames to skip between screenshots
-    frame_interval = int(fps * interval_sec)
-    
-    saved_files_arr = []
-    frame_count = 0
-    success = True
+    frame_interval = max(1, int(fps * interval_sec))
+    # some containers don't report a frame count, so read until the stream ends
+    if frame_total <= 0:
+        frame_total = sys.maxsize
+    return range(0, frame_total, frame_interval)
+
+def _read_frames_sequential(video_data, frame_indices: Sequence[int]):
+    # grab() every frame but only retrieve() (decode + color convert) the ones we keep
+    targets = iter(frame_indices)
+    next_target = next(targets, None)
+    frame_index = 0
+
+    while next_target is not None:
+        if not video_data.grab():
+            break
+
+        if frame_index == next_target:
+            success, frame = video_data.retrieve()
+            if success:
+                yield frame_index, frame
+            next_target = next(targets, None)
+
+        frame_index += 1
+
+def _read_frames_seek(video_data, frame_indices: Sequence[int]):
+    position = 0
+
+    for target in frame_indices:
+        gap = target - position
+
+        if gap > SEEK_MIN_GAP_FRAMES:
+            video_data.set(cv2.CAP_PROP_POS_FRAMES, target)
+            # some containers (variable frame rate, broken indexes) land on the wrong frame
+            if int(video_data.get(cv2.CAP_PROP_POS_FRAMES)) != target:
+                raise ValueError(f"Inaccurate seek to frame {target}")
+        else:
+            for _ in range(max(gap, 0)):
+                if not video_data.grab():
+                    return
 
-    while success:
         success, frame = video_data.read()
         if not success:
-            break
+            raise ValueError(f"Couldn't read frame {target} after seeking")
+
+        yield target, frame
+        position = target + 1
+
+def read_frames(source_path: str, frame_indices: Sequence[int], mode: str = "seek"):
+    """
+    Yields (frame_index, frame) for each requested frame index, in order.
+    In "seek" mode, falls back to sequential decoding if the container can't seek accurately.
+    """
+    video_data = cv2.VideoCapture(source_path)
+    if not video_data.isOpened():
+        print("Error: Couldn't open video...")
+        return
 
-        if frame_count % frame_interval == 0:
-            timestamp_ms = video_data.get(cv2.CAP_PROP_POS_MSEC)
-            sec = int(timestamp_ms / 1000)
-            
-            filename = f"frame_{sec}.jpg"
-            output_path = os.path.join(output_dir, filename)
-            
-            cv2.imwrite(output_path, frame)
-            saved_files_arr.append(filename)
-            print(f"Saved {filename}")
+    try:
+        if mode == "seek":
+            delivered = 0
+            try:
+                for frame_index, frame in _read_frames_seek(video_data, frame_indices):
+                    yield frame_index, frame
+                    delivered += 1
+                return
+            except ValueError as e:
+                print(f"Seeking failed ({e}), falling back to sequential decoding")
 
-        frame_count += 1
+            # reopen so sequential decoding starts from a clean state
+            video_data.release()
+            video_data = cv2.VideoCapture(source_path)
+            frame_indices = frame_indices[delivered:]
 
+        yield from _read_frames_sequential(video_data, frame_indices)
+    finally:
+        video_data.release()
+
+def get_video_info(source_path: str) -> dict | None:
+    video_data = cv2.VideoCapture(source_path)
+    if not video_data.isOpened():
+        return None
+
+    info = {
+        "fps": video_data.get(cv2.CAP_PROP_FPS),
+        "frame_total": int(video_data.get(cv2.CAP_PROP_FRAME_COUNT)),
+    }
     video_data.release()
-    return saved_files_arr
\ No newline at end of file
+    return info
+
+def frame_filename(frame_index: int, fps: float, precise: bool = False) -> str:
+    # adaptive selection can keep several frames per second, so those are named by millisecond
+    if precise:
+        ms = int(frame_index * 1000 / fps)
+        return f"frame_{ms}ms.jpg"
+    sec = int(frame_index / fps)
+    return f"frame_{sec}.jpg"
+
+def compute_motion_scores(source_path: str, fps: float, frame_total: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Returns (frame_indices, scores) where each score is the mean absolute difference
+    between a downscaled grayscale frame and the previously sampled one.
+    """
+    step = max(1, int(round(fps / MOTION_ANALYSIS_FPS)))
+    sample_indices = range(0, frame_total if frame_total > 0 else sys.maxsize, step)
+
+    indices = []
+    thumbnails = []
+    for frame_index, frame in read_frames(source_path, sample_indices, mode="sequential"):
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        thumbnails.append(cv2.resize(gray, MOTION_THUMBNAIL_SIZE, interpolation=cv2.INTER_AREA))
+        indices.append(frame_index)
+
+    if not thumbnails:
+        return np.array([], dtype=np.int64), np.array([], dtype=np.float32)
+
+    stack = np.stack(thumbnails).astype(np.float32)
+    diffs = np.abs(np.diff(stack, axis=0)).mean(axis=(1, 2))
+    # the first frame has no predecessor, so it borrows the next frame's score
+    scores = np.concatenate([diffs[:1], diffs]) if len(diffs) else np.zeros(1, dtype=np.float32)
+
+    return np.array(indices, dtype=np.int64), scores
+
+def select_adaptive_frames(frame_indices: np.ndarray, scores: np.ndarray, frame_budget: int) -> list[int]:
+    """
+    Picks up to `frame_budget` frames, placed densely where motion is high and sparsely elsewhere.
+    """
+    if len(frame_indices) <= frame_budget:
+        return frame_indices.tolist()
+
+    total = scores.sum()
+    motion = scores / total if total > 0 else np.full(len(scores), 1 / len(scores))
+    weights = (1 - MOTION_BASELINE_SHARE) * motion + MOTION_BASELINE_SHARE / len(scores)
+
+    # inverse-CDF sampling: evenly spaced quantiles land more often on high-motion samples
+    cumulative = np.cumsum(weights)
+    quantiles = (np.arange(frame_budget) + 0.5) / frame_budget
+    picks = np.searchsorted(cumulative, quantiles * cumulative[-1])
+    picks = np.unique(np.clip(picks, 0, len(frame_indices) - 1))
+
+    return frame_indices[picks].tolist()
+
+def dhash(frame) -> np.ndarray:
+    """
+    64-bit difference hash packed into 8 bytes: each bit says whether a pixel of a
+    9x8 grayscale thumbnail is brighter than its right-hand neighbour.
+    """
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+    thumbnail = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA)
+    return np.packbits(thumbnail[:, 1:] > thumbnail[:, :-1])
+
+def hamming_distance(hash_a: np.ndarray, hash_b: np.ndarray) -> int:
+    return int(np.unpackbits(np.bitwise_xor(hash_a, hash_b)).sum())
+
+class FrameDeduplicator:
+    """
+    Drops frames that are near-identical to the last frame kept, e.g. while stopped at a red light.
+    """
+    def __init__(self, threshold: int = DEDUP_HAMMING_THRESHOLD):
+        self.threshold = threshold
+        self.kept = 0
+        self.dropped = 0
+        self._last_hash = None
+
+    def is_duplicate(self, frame) -> bool:
+        return self.is_duplicate_hash(dhash(frame))
+
+    def is_duplicate_hash(self, frame_hash: np.ndarray) -> bool:
+        if self._last_hash is not None and hamming_distance(frame_hash, self._last_hash) <= self.threshold:
+            self.dropped += 1
+            return True
+
+        self._last_hash = frame_hash
+        self.kept += 1
+        return False
+
+    def stats(self) -> dict:
+        return {
+            "threshold": self.threshold,
+            "frames_kept": self.kept,
+            "frames_dropped": self.dropped,
+        }
+
+def plan_frame_indices(source_path: str, info: dict, interval_sec: int = 1, selection: str = "interval", frame_budget: int = ADAPTIVE_FRAME_BUDGET) -> Sequence[int]:
+    if selection == "adaptive":
+        indices, scores = compute_motion_scores(source_path, info["fps"], info["frame_total"])
+        return select_adaptive_frames(indices, scores, frame_budget)
+
+    return _target_frame_indices(info["fps"], info["frame_total"], interval_sec)
+
+def encode_jpeg(frame) -> bytes:
+    success, buffer = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY])
+    if not success:
+        raise ValueError("Couldn't encode frame as JPEG")
+    return buffer.tobytes()
+
+def seeks_accurately(source_path: str, frame_index: int) -> bool:
+    video_data = cv2.VideoCapture(source_path)
+    try:
+        video_data.set(cv2.CAP_PROP_POS_FRAMES, frame_index)
+        return int(video_data.get(cv2.CAP_PROP_POS_FRAMES)) == frame_index
+    finally:
+        video_data.release()
+
+def plan_screenshots(source_path: str, interval_sec: int = 1, selection: str = "interval", frame_budget: int = ADAPTIVE_FRAME_BUDGET) -> dict | None:
+    """
+    Decides which frames to extract. Returns only picklable values so it can run in a worker process.
+    Mode is "sequential" when the container has no frame count or can't seek to the last target;
+    a sequential plan must be decoded in a single pass, since every read starts at frame 0.
+    """
+    info = get_video_info(source_path)
+    if info is None or not info["fps"]:
+        print("Error: Couldn't open video...")
+        return None
+
+    frame_indices = plan_frame_indices(source_path, info, interval_sec, selection, frame_budget)
+    mode = "seek" if info["frame_total"] > 0 else "sequential"
+    if mode == "seek" and len(frame_indices) and frame_indices[-1] > SEEK_MIN_GAP_FRAMES and not seeks_accurately(source_path, frame_indices[-1]):
+        mode = "sequential"
+
+    return {
+        "fps": info["fps"],
+        "frame_total": info["frame_total"],
+        "mode": mode,
+        "precise": selection == "adaptive",
+        "frame_indices": frame_indices,
+    }
+
+def extract_screenshot_batch(source_path: str, frame_indices: Sequence[int], fps: float, mode: str, precise: bool = False) -> list[tuple[str, bytes, bytes]]:
+    """
+    Decodes and JPEG-encodes one batch of frames, returning (filename, jpeg_bytes, dhash_bytes)
+    so the caller can deduplicate across batches without the raw frames.
+    """
+    return [
+        (frame_filename(frame_index, fps, precise), encode_jpeg(frame), dhash(frame).tobytes())
+        for frame_index, frame in read_frames(source_path, frame_indices, mode=mode)
+    ]
+
+def parallel_batch_count(fps: float, frame_total: int, workers: int, min_segment_sec: int = PARALLEL_MIN_SEGMENT_SEC) -> int:
+    """
+    How many batches of one clip to decode at once: at most one per worker, and only
+    one per `min_segment_sec` of video.
+    """
+    duration_sec = frame_total / fps if frame_total > 0 and fps else 0
+    return max(1, min(workers, int(duration_sec // max(min_segment_sec, 1))))
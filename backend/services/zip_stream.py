@@ -0,0 +1,44 @@
+import zipfile
+
+class _ZipChunkSink:
+    """
+    Write-only sink for zipfile. It has no seek(), so zipfile writes data
+    descriptors after each entry instead of rewinding to patch the headers.
+    """
+    def __init__(self):
+        self._chunks = []
+        self._offset = 0
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._offset += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._offset
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+class ZipStreamWriter:
+    """
+    Incremental ZIP writer: add() and close() return the archive bytes produced by that call.
+    """
+    def __init__(self):
+        self._sink = _ZipChunkSink()
+        # JPEGs are already compressed, deflating them again only costs CPU
+        self._zip_file = zipfile.ZipFile(self._sink, "w", zipfile.ZIP_STORED)
+
+    def add(self, arcname: str, data: bytes) -> bytes:
+        self._zip_file.writestr(arcname, data)
+        return self._sink.drain()
+
+    def close(self) -> bytes:
+        # central directory is written on close
+        self._zip_file.close()
+        return self._sink.drain()
@@ -0,0 +1,25 @@
+"""
+Tests run without Firebase or Gemini credentials: the two setup modules that connect at
+import are replaced before any app code is imported, and each test swaps in what it needs.
+Run from the backend directory: 'python -m pytest tests'.
+"""
+import os
+import sys
+import types
+from unittest.mock import MagicMock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret")
+
+firebase_setup = types.ModuleType("core.firebase_setup")
+firebase_setup.db = MagicMock()
+firebase_setup.async_db = MagicMock()
+firebase_setup.bucket = MagicMock()
+firebase_setup.firebase_auth = MagicMock()
+firebase_setup.upload_blob_async = MagicMock()
+sys.modules["core.firebase_setup"] = firebase_setup
+
+gemini_setup = types.ModuleType("core.gemini_setup")
+gemini_setup.gemini_flash_model = MagicMock()
+gemini_setup.gemini_pro_model = MagicMock()
+sys.modules["core.gemini_setup"] = gemini_setup
@@ -0,0 +1,95 @@
+import uuid
+from collections import Counter
+
+class FakeSnapshot:
+    def __init__(self, reference, data: dict | None):
+        self.reference = reference
+        self.id = reference.id
+        self.exists = data is not None
+        self._data = data
+
+    def to_dict(self) -> dict | None:
+        return dict(self._data) if self._data is not None else None
+
+class FakeDocumentRef:
+    def __init__(self, db, path: str):
+        self._db = db
+        self.path = path
+        self.id = path.rsplit("/", 1)[-1]
+
+    def collection(self, name: str):
+        return FakeCollection(self._db, f"{self.path}/{name}")
+
+    def get(self, transaction=None):
+        self._db.calls["get"] += 1
+        return self._snapshot()
+
+    def set(self, data: dict, merge: bool = False):
+        self._db.calls["set"] += 1
+        self._db.write(self.path, data, merge)
+
+    def _snapshot(self) -> FakeSnapshot:
+        return FakeSnapshot(self, self._db.docs.get(self.path))
+
+class FakeCollection:
+    def __init__(self, db, path: str):
+        self._db = db
+        self.path = path
+
+    def document(self, doc_id: str | None = None):
+        return FakeDocumentRef(self._db, f"{self.path}/{doc_id or uuid.uuid4().hex}")
+
+    def select(self, field_paths):
+        return self
+
+    def stream(self):
+        self._db.calls["stream"] += 1
+        prefix = f"{self.path}/"
+        return [
+            FakeDocumentRef(self._db, path)._snapshot()
+            for path in sorted(self._db.docs)
+            if path.startswith(prefix) and "/" not in path[len(prefix):]
+        ]
+
+class FakeBatch:
+    def __init__(self, db):
+        self._db = db
+        self._writes = []
+
+    def set(self, reference, data: dict, merge: bool = False):
+        self._writes.append((reference.path, data, merge))
+
+    def delete(self, reference):
+        self._writes.append((reference.path, None, False))
+
+    def commit(self):
+        self._db.calls["commit"] += 1
+        for path, data, merge in self._writes:
+            self._db.write(path, data, merge)
+
+class FakeFirestore:
+    """
+    In-memory stand-in for the sync Firestore client. Every call that would be a network
+    round-trip is counted in `calls`.
+    """
+    def __init__(self):
+        self.docs: dict[str, dict] = {}
+        self.calls = Counter()
+
+    def collection(self, name: str):
+        return FakeCollection(self, name)
+
+    def get_all(self, references):
+        self.calls["get_all"] += 1
+        return [reference._snapshot() for reference in references]
+
+    def batch(self):
+        return FakeBatch(self)
+
+    def write(self, path: str, data: dict | None, merge: bool = False):
+        if data is None:
+            self.docs.pop(path, None)
+        elif merge and path in self.docs:
+            self.docs[path] = {**self.docs[path], **data}
+        else:
+            self.docs[path] = dict(data)
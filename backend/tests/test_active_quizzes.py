@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta
+import pytest
+from fastapi import BackgroundTasks
+from api import quiz_api
+from tests.fake_firestore import FakeFirestore
+
+UID = "user-1"
+QUESTIONS = [{"question_text": "Who goes first?", "question_type": "multiple_choice", "options": ["Me", "You"], "correct_answer_index": 1}]
+
+def completion(completed_at: datetime, topic: str) -> dict:
+    return {"topic": topic, "completed_at": completed_at, "final_score": 100.0, "results": []}
+
+def seed_user(db: FakeFirestore, history_size: int, backfilled: bool = True):
+    user_path = f"users/{UID}"
+    now = datetime.now()
+    for i in range(history_size):
+        db.docs[f"{user_path}/quiz_completions/old_{i}"] = completion(now - timedelta(days=i + 2), f"Old topic {i}")
+    db.docs[f"{user_path}/quiz_meta/seen_topics"] = {"topics": [f"Old topic {i}" for i in range(history_size)], "backfilled": backfilled}
+
+    # one active quiz finished on a previous day, one finished today, one still open
+    db.docs[f"{user_path}/active_quizzes/stale"] = {"topic": "Stale", "questions": QUESTIONS}
+    db.docs[f"{user_path}/quiz_completions/stale"] = completion(now - timedelta(days=1), "Stale")
+    db.docs[f"{user_path}/active_quizzes/done_today"] = {"topic": "Done today", "questions": QUESTIONS}
+    db.docs[f"{user_path}/quiz_completions/done_today"] = completion(now, "Done today")
+    db.docs[f"{user_path}/active_quizzes/open"] = {"topic": "Open", "questions": QUESTIONS}
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    db = FakeFirestore()
+    monkeypatch.setattr(quiz_api, "db", db)
+    monkeypatch.setattr(quiz_api, "get_daily_quiz", lambda: {"topic": "Daily", "questions": QUESTIONS})
+    return db
+
+@pytest.fixture
+def claims(monkeypatch):
+    # the pool claim is its own transaction; record it instead of running it
+    claimed = []
+
+    def claim_quizzes(experience, count, excluded_topics):
+        claimed.append(count)
+        return [{"topic": f"Pooled {i}", "questions": QUESTIONS} for i in range(count)]
+
+    monkeypatch.setattr(quiz_api, "claim_quizzes", claim_quizzes)
+    return claimed
+
+@pytest.mark.parametrize("history_size", [0, 50, 500])
+def test_round_trips_do_not_grow_with_history(fake_db, claims, history_size):
+    seed_user(fake_db, history_size)
+
+    quizzes = quiz_api.get_active_quizzes(BackgroundTasks(), {"uid": UID})
+
+    # daily completion + seen topics, active snapshot, their completions, cleanup batch, additions batch
+    assert fake_db.calls == {"get_all": 2, "stream": 1, "commit": 2}
+    assert claims == [1]
+    assert [quiz["topic"] for quiz in quizzes] == ["Daily", "Done today", "Open", "Pooled 0"]
+    assert [quiz["is_completed"] for quiz in quizzes] == [False, True, False, False]
+    assert f"users/{UID}/active_quizzes/stale" not in fake_db.docs
+
+def test_seen_topics_backfill_runs_once(fake_db, claims):
+    seed_user(fake_db, 50, backfilled=False)
+
+    quiz_api.get_active_quizzes(BackgroundTasks(), {"uid": UID})
+    # the first call also scans the history and marks the seen-topics doc as backfilled
+    assert fake_db.calls == {"get_all": 2, "stream": 2, "set": 1, "commit": 2}
+
+    fake_db.calls.clear()
+    quiz_api.get_active_quizzes(BackgroundTasks(), {"uid": UID})
+    # the active list is already full now, so nothing is claimed or written
+    assert fake_db.calls == {"get_all": 2, "stream": 1}
+    assert fake_db.docs[f"users/{UID}/quiz_meta/seen_topics"]["backfilled"] is True
+
+def test_failed_claim_still_serves_active_quizzes(fake_db, monkeypatch):
+    seed_user(fake_db, 0)
+
+    def claim_quizzes(experience, count, excluded_topics):
+        raise RuntimeError("transaction ran out of retries")
+
+    monkeypatch.setattr(quiz_api, "claim_quizzes", claim_quizzes)
+    background_tasks = BackgroundTasks()
+
+    quizzes = quiz_api.get_active_quizzes(background_tasks, {"uid": UID})
+
+    assert [quiz["topic"] for quiz in quizzes] == ["Daily", "Done today", "Open"]
+    # the pool is still topped up after the response
+    assert [task.func for task in background_tasks.tasks] == [quiz_api.refill_pool]
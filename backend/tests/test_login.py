@@ -0,0 +1,134 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import httpx
+import pytest
+from fastapi import FastAPI
+from api import firebase_auth
+from core import http_client
+
+PASSWORD = "correct-horse"
+
+class StubIdentityToolkit(BaseHTTPRequestHandler):
+    """
+    Answers signInWithPassword like the Identity Toolkit, and counts connections and
+    concurrent requests so tests can check pooling and the concurrency bound.
+    """
+    protocol_version = "HTTP/1.1"
+    delay_sec = 0.0
+    # answer like a proxy in front of the toolkit that failed: a 502 HTML page
+    bad_gateway = False
+    lock = threading.Lock()
+    connections = 0
+    in_flight = 0
+    peak_in_flight = 0
+
+    def setup(self):
+        with self.lock:
+            type(self).connections += 1
+        super().setup()
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        cls = type(self)
+        with cls.lock:
+            cls.in_flight += 1
+            cls.peak_in_flight = max(cls.peak_in_flight, cls.in_flight)
+        try:
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            time.sleep(cls.delay_sec)
+            if not self.path.startswith("/v1/accounts:signInWithPassword?key="):
+                status, payload = 404, {"error": {"message": "NOT_FOUND"}}
+            elif body.get("password") == PASSWORD:
+                status, payload = 200, {"idToken": "id-token", "localId": f"uid-{body['email']}"}
+            else:
+                status, payload = 400, {"error": {"message": "INVALID_PASSWORD"}}
+        finally:
+            with cls.lock:
+                cls.in_flight -= 1
+
+        data, content_type = json.dumps(payload).encode(), "application/json"
+        if cls.bad_gateway:
+            status, data, content_type = 502, b"<html><body>502 Bad Gateway</body></html>", "text/html"
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+@pytest.fixture
+def identity_toolkit(monkeypatch):
+    handler = type("Handler", (StubIdentityToolkit,), {"lock": threading.Lock()})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(firebase_auth, "rest_api_url", f"http://127.0.0.1:{server.server_port}/v1/accounts:signInWithPassword")
+    yield handler
+    server.shutdown()
+    server.server_close()
+
+def run_logins(credentials: list[tuple[str, str]], max_concurrency: int = firebase_auth.SIGN_IN_MAX_CONCURRENCY) -> list[httpx.Response]:
+    app = FastAPI()
+    app.include_router(firebase_auth.router, prefix="/auth")
+
+    async def scenario():
+        http_client.start_http_client()
+        try:
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://app") as client:
+                return await asyncio.gather(*(
+                    client.post("/auth/login", json={"email": email, "password": password})
+                    for email, password in credentials
+                ))
+        finally:
+            await http_client.stop_http_client()
+
+    # a semaphore belongs to the loop that first waits on it, so each run gets its own
+    sign_in_slots = firebase_auth._sign_in_slots
+    firebase_auth._sign_in_slots = asyncio.Semaphore(max_concurrency)
+    try:
+        return asyncio.run(scenario())
+    finally:
+        firebase_auth._sign_in_slots = sign_in_slots
+
+def test_login_returns_app_token(identity_toolkit):
+    [response] = run_logins([("driver@example.com", PASSWORD)])
+
+    assert response.status_code == 200
+    assert response.json()["token_type"] == "bearer"
+    assert response.json()["access_token"]
+
+def test_wrong_password_is_401_with_toolkit_message(identity_toolkit):
+    [response] = run_logins([("driver@example.com", "wrong")])
+
+    assert response.status_code == 401
+    assert response.json()["detail"] == "INVALID_PASSWORD"
+
+def test_unreachable_toolkit_is_503(monkeypatch):
+    # nothing listens on port 1
+    monkeypatch.setattr(firebase_auth, "rest_api_url", "http://127.0.0.1:1/v1/accounts:signInWithPassword")
+
+    [response] = run_logins([("driver@example.com", PASSWORD)])
+
+    assert response.status_code == 503
+    assert response.json()["detail"].startswith("Could not connect to Firebase Auth API")
+
+def test_non_json_toolkit_response_is_503(identity_toolkit):
+    identity_toolkit.bad_gateway = True
+
+    [response] = run_logins([("driver@example.com", PASSWORD)])
+
+    assert response.status_code == 503
+    assert response.json()["detail"].startswith("Could not connect to Firebase Auth API")
+
+def test_login_burst_reuses_pooled_connections(identity_toolkit):
+    identity_toolkit.delay_sec = 0.01
+
+    responses = run_logins([(f"driver{i}@example.com", PASSWORD) for i in range(100)], max_concurrency=5)
+
+    assert [response.status_code for response in responses] == [200] * 100
+    # at most one connection per sign-in slot, each kept alive for the requests after it
+    assert identity_toolkit.peak_in_flight <= 5
+    assert identity_toolkit.connections <= 5
@@ -0,0 +1,27 @@
+import pytest
+from pydantic import ValidationError
+from schemas.simulation import SimulationScene
+
+def scene(vehicles: list[dict], first_poses: list[dict]) -> dict:
+    return {
+        "vehicles": vehicles,
+        "keyframes": [
+            {"t": 0, "vehicles": first_poses},
+            {"t": 5, "vehicles": [{"id": "ego", "x": 0, "z": 40}]}
+        ]
+    }
+
+EGO = {"id": "ego", "role": "ego"}
+OTHER = {"id": "car_1"}
+
+def test_valid_scene():
+    SimulationScene.model_validate(scene([EGO, OTHER], [{"id": "ego", "x": 0, "z": 0}, {"id": "car_1", "x": 10, "z": 5}]))
+
+def test_ego_missing_from_first_keyframe_is_rejected():
+    # the template's chase camera has nothing to follow on the first frame
+    with pytest.raises(ValidationError, match="ego vehicle must appear in the first keyframe"):
+        SimulationScene.model_validate(scene([EGO, OTHER], [{"id": "car_1", "x": 10, "z": 5}]))
+
+def test_duplicate_vehicle_ids_are_rejected():
+    with pytest.raises(ValidationError, match="Vehicle ids must be unique"):
+        SimulationScene.model_validate(scene([EGO, {"id": "ego"}], [{"id": "ego", "x": 0, "z": 0}]))
@@ -34,6 +34,12 @@ export function AppSidebar({ user, ...props }: any) {
   const navigate = useNavigate();
   
     useEffect(() => {
+      // pages that already loaded the profile pass it in
+      if (user) {
+        setUserStats(user);
+        setIsLoading(false);
+        return;
+      }
       const fetchUserData = async () => {
         const token = localStorage.getItem("accessToken");
         if (!token) {
@@ -54,7 +60,7 @@ export function AppSidebar({ user, ...props }: any) {
         }
       };
       fetchUserData();
-    }, [navigate]);
+    }, [navigate, user]);
 
   userDataForNav.name_first = userStats?.first_name || "User"
   userDataForNav.name_last = userStats?.last_name || "Last"
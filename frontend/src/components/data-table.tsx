@@ -30,17 +30,24 @@ interface DataTableProps<TData, TValue> {
   data: TData[]
   filterValue?: string
   onFilterChange?: (value: string) => void
+  // more rows exist on the server than in data; Next calls onLoadMore once the loaded rows run out
+  hasMore?: boolean
+  onLoadMore?: () => void
 }
 
 export function DataTable<TData, TValue>({
     columns,
     data,
     filterValue = "",
+    hasMore = false,
+    onLoadMore,
 }: DataTableProps<TData, TValue>) {
     const [sorting, setSorting] = React.useState<SortingState>([]);
     const [columnFilters, setColumnFilters] = React.useState<ColumnFiltersState>([]);
 
     const [rowSelection, setRowSelection] = React.useState({});
+    // Next was pressed on the last loaded page; move forward once the extra rows arrive
+    const [advancePending, setAdvancePending] = React.useState(false);
 
     // Update column filters when filterValue changes
     React.useEffect(() => {
@@ -56,6 +63,8 @@ export function DataTable<TData, TValue>({
         columns,
         getCoreRowModel: getCoreRowModel(),
         getPaginationRowModel: getPaginationRowModel(),
+        // appending a fetched page shouldn't jump back to the first page
+        autoResetPageIndex: false,
         initialState: {
             pagination: {
             pageSize: 10, // controls how many rows are shown before having to move to next page
@@ -73,6 +82,27 @@ export function DataTable<TData, TValue>({
         },
     })
 
+    React.useEffect(() => {
+        if (!advancePending) {
+            return;
+        }
+        if (table.getCanNextPage()) {
+            table.nextPage();
+            setAdvancePending(false);
+        } else if (!hasMore) {
+            setAdvancePending(false);
+        }
+    }, [data, hasMore, advancePending]);
+
+    const goToNextPage = () => {
+        if (table.getCanNextPage()) {
+            table.nextPage();
+        } else if (hasMore && onLoadMore) {
+            setAdvancePending(true);
+            onLoadMore();
+        }
+    };
+
     return (
         <div>
             {/*
@@ -144,8 +174,8 @@ export function DataTable<TData, TValue>({
                     <Button
                         variant="outline"
                         size="sm"
-                        onClick={() => table.nextPage()}
-                        disabled={!table.getCanNextPage()}
+                        onClick={goToNextPage}
+                        disabled={advancePending || (!table.getCanNextPage() && !hasMore)}
                         >
                         Next
                     </Button>
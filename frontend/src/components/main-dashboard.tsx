@@ -1,7 +1,6 @@
 import { cn } from "@/lib/utils";
 import { Trophy, ChartNoAxesColumnIncreasing, MoveRight, CircleStar, Award, Medal, ArrowUpRight} from 'lucide-react';
-import { useEffect, useState } from "react";
-import { Link, useNavigate } from "react-router-dom";
+import { Link } from "react-router-dom";
 
 interface Achievement {
   id: string;
@@ -9,53 +8,8 @@ interface Achievement {
   achieved_at: string;
 }
 
-function MainDashboard({ stats, className, ...props }: any) {
-    const [achievements, setAchievements] = useState<Achievement[]>([]);
-    const [isLoading, setIsLoading] = useState(true);
-    const [error, setError] = useState("");
-    const navigate = useNavigate();
-
-    useEffect(() => {
-    const fetchData = async () => {
-      const token = localStorage.getItem("accessToken");
-      if (!token) {
-        navigate("/login");
-        return;
-      }
-
-      try {
-        const [achievementsResponse] = await Promise.all([
-          fetch("http://127.0.0.1:8000/achievements/recentAchievements", {
-            headers: { Authorization: `Bearer ${token}` },
-          }),
-        ]);
-
-        if (!achievementsResponse.ok) {
-          throw new Error("Failed to fetch dashboard data.");
-        }
-
-        const achievementsData = await achievementsResponse.json();
-
-        setAchievements(achievementsData);
-
-      } catch (err: any) {
-        setError(err.message);
-      } finally {
-        setIsLoading(false);
-      }
-    };
-
-    fetchData();
-    }, [navigate]);
-
-    if (isLoading) {
-        return <div className={cn("flex justify-center items-center p-8", className)}>Loading dashboard...</div>;
-    }
-
-    if (error) {
-        return <div className={cn("flex justify-center items-center p-8 text-red-500", className)}>Error: {error}</div>;
-    }
-  
+// stats and achievements come from the page's single /dashboard request
+function MainDashboard({ stats, achievements = [], className, ...props }: any) {
     return (
       <div className={cn("flex flex-col gap-6 max-sm:p-4 p-8", className)} {...props}>
         <div className="flex flex-col gap-3 min-h-[80px]">
@@ -73,7 +27,7 @@ function MainDashboard({ stats, className, ...props }: any) {
             </div>
             <div className="flex flex-col flex-1 gap-2 py-3">
               {achievements.length > 0 ? (
-                  achievements.map((ach) => (
+                  achievements.map((ach: Achievement) => (
                     <Link to="/quizzes" key={ach.id} className="group relative flex gap-2 bg-darkPurple/15 rounded-lg border flex-1 cursor-pointer hover:bg-darkPurple/5 transition-all p-4 flex items-center">
                       <Award />
                       <p className="font-medium">{ach.achievement_name}</p>
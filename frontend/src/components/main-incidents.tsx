@@ -2,18 +2,31 @@
 import { cn } from "@/lib/utils";
 import { columns, type Incident } from "./incidents-columns";
 import { DataTable } from "./data-table"; 
-import { useEffect, useState } from "react";
+import { useCallback, useEffect, useRef, useState } from "react";
 import { IncidentsSearch } from "./incidents-search";
 
-async function getData(): Promise<Incident[]> {
+// one request per table page would be chatty, so each fetch covers a few of them
+const FETCH_PAGE_SIZE = 50;
+
+interface IncidentsPage {
+  incidents: Incident[];
+  nextCursor: string | null;
+}
+
+async function getData(cursor: string | null): Promise<IncidentsPage> {
   const token = localStorage.getItem("accessToken");
   if (!token) {
     console.error("Authentication token not found.");
-    return [];
+    return { incidents: [], nextCursor: null };
   }
 
   try {
-    const response = await fetch("http://127.0.0.1:8000/incidents/getAll", {
+    // The list only needs summary fields; later pages are fetched when the user pages past what's loaded
+    const params = new URLSearchParams({ view: "summary", page_size: String(FETCH_PAGE_SIZE) });
+    if (cursor) {
+      params.set("start_after", cursor);
+    }
+    const response = await fetch(`http://127.0.0.1:8000/incidents/getAll?${params}`, {
       headers: {
         "Authorization": `Bearer ${token}`,
       },
@@ -23,9 +36,8 @@ async function getData(): Promise<Incident[]> {
       throw new Error("Failed to fetch incidents.");
     }
 
-    const backendIncidents = await response.json();
-
-    return backendIncidents.map((incident: any) => {
+    const page = await response.json();
+    const incidents = page.items.map((incident: any) => {
       const createdAt = new Date(incident.created_at);
 
       const words = incident.incident_summary.split(' ');
@@ -44,29 +56,40 @@ async function getData(): Promise<Incident[]> {
       };
     });
 
+    return { incidents, nextCursor: page.next_cursor };
+
   } catch (error) {
     console.error("Error fetching data:", error);
-    return []; 
+    return { incidents: [], nextCursor: null };
   }
 }
 
 export function MainIncidents({ className, ...props }: React.ComponentProps<"div">) {
     const [data, setData] = useState<Incident[]>([]);
+    const [nextCursor, setNextCursor] = useState<string | null>(null);
     const [filterValue, setFilterValue] = useState("");
+    const loading = useRef(false);
 
-    useEffect(() => {
-        async function fetchData() {
-            try {
-                const result = await getData();
-                setData(result);
-            } catch (error) {
-                console.error("Error fetching data:", error);
-            }
+    const loadPage = useCallback(async (cursor: string | null) => {
+        if (loading.current) {
+            return;
+        }
+        loading.current = true;
+        try {
+            const page = await getData(cursor);
+            setData((current) => cursor ? [...current, ...page.incidents] : page.incidents);
+            setNextCursor(page.nextCursor);
+        } catch (error) {
+            console.error("Error fetching data:", error);
+        } finally {
+            loading.current = false;
         }
-
-        fetchData();
     }, []);
 
+    useEffect(() => {
+        loadPage(null);
+    }, [loadPage]);
+
     return (
         <div className={cn("flex flex-col gap-6 max-sm:p-4 p-8", className)} {...props}>
             <div className="flex flex-col gap-3 min-h-[80px]">
@@ -85,6 +108,8 @@ export function MainIncidents({ className, ...props }: React.ComponentProps<"div
                     data={data} 
                     filterValue={filterValue}
                     onFilterChange={setFilterValue}
+                    hasMore={nextCursor !== null}
+                    onLoadMore={() => loadPage(nextCursor)}
                 />
             </div>
         </div>
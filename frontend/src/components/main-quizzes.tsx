@@ -23,16 +23,28 @@ interface Quiz {
     } | null;
 }
 
+interface QuizHistorySummary {
+    quiz_id: string;
+    topic: string;
+    completed_at: string;
+    final_score: number;
+}
+
 interface UserStats {
     daily_quiz_streak: number;
 }
 
+interface QuizStats {
+    attempts: number;
+    average_score: number;
+}
+
 // import { Button } from "@/components/ui/button"
 
 function MainQuizzes({ className, ...props }: React.ComponentProps<"div">) {
     const [dailyQuiz, setDailyQuiz] = useState<Quiz | null>(null);
     const [availableQuizzes, setAvailableQuizzes] = useState<Quiz[]>([]);
-    const [recentQuizzes, setRecentQuizzes] = useState<Quiz[]>([]);
+    const [recentQuizzes, setRecentQuizzes] = useState<QuizHistorySummary[]>([]);
     const [stats, setStats] = useState({ streak: 0, quizzesTaken: 0, averageScore: 0 });
     const [isLoading, setIsLoading] = useState(true);
     const navigate = useNavigate();
@@ -46,19 +58,21 @@ function MainQuizzes({ className, ...props }: React.ComponentProps<"div">) {
             }
 
             try {
-                const [activeRes, historyRes, userStatsRes] = await Promise.all([
+                const [activeRes, historyRes, userStatsRes, quizStatsRes] = await Promise.all([
                     fetch("http://127.0.0.1:8000/quiz/active", { headers: { Authorization: `Bearer ${token}` } }),
-                    fetch("http://127.0.0.1:8000/quiz/history", { headers: { Authorization: `Bearer ${token}` } }),
+                    fetch("http://127.0.0.1:8000/quiz/history?view=summary&page_size=3", { headers: { Authorization: `Bearer ${token}` } }),
                     fetch("http://127.0.0.1:8000/users/getUserInfo", { headers: { Authorization: `Bearer ${token}` } }),
+                    fetch("http://127.0.0.1:8000/quiz/stats", { headers: { Authorization: `Bearer ${token}` } }),
                 ]);
 
-                if (!activeRes.ok || !historyRes.ok || !userStatsRes.ok) {
+                if (!activeRes.ok || !historyRes.ok || !userStatsRes.ok || !quizStatsRes.ok) {
                     throw new Error("Failed to fetch quiz data.");
                 }
 
                 const activeQuizzesData: Quiz[] = await activeRes.json();
-                const historyData: Quiz[] = await historyRes.json();
+                const historyPage: { items: QuizHistorySummary[] } = await historyRes.json();
                 const userStatsData: UserStats = await userStatsRes.json();
+                const quizStatsData: QuizStats = await quizStatsRes.json();
                 
                 // Process active quizzes to find the daily one
                 const daily = activeQuizzesData.find(q => q.quiz_id.startsWith("")) || null;
@@ -67,17 +81,13 @@ function MainQuizzes({ className, ...props }: React.ComponentProps<"div">) {
                 setAvailableQuizzes(available);
                 
                 // Set recent quizzes (latest 3 from history)
-                setRecentQuizzes(historyData.slice(0, 3));
+                setRecentQuizzes(historyPage.items);
 
-                // Calculate and set stats
-                const quizzesTaken = historyData.length;
-                const totalScore = historyData.reduce((sum, q) => sum + (q.past_results?.final_score || 0), 0);
-                const averageScore = quizzesTaken > 0 ? Math.round(totalScore / quizzesTaken) : 0;
-                
+                // Totals come from the server-side stats instead of the whole history
                 setStats({
                     streak: userStatsData.daily_quiz_streak,
-                    quizzesTaken: quizzesTaken,
-                    averageScore: averageScore
+                    quizzesTaken: quizStatsData.attempts,
+                    averageScore: Math.round(quizStatsData.average_score)
                 });
 
             } catch (error) {
@@ -169,7 +179,7 @@ function MainQuizzes({ className, ...props }: React.ComponentProps<"div">) {
                                         <Hand className="w-6 h-6" /> 
                                         <p className="text-md font-medium max-md:text-sm">{quiz.topic}</p>
                                     </div>
-                                    <p>{Math.round(quiz.past_results?.final_score || 0)}%</p>
+                                    <p>{Math.round(quiz.final_score || 0)}%</p>
                                 </div>
                             ))}
                     </div>
@@ -106,8 +106,25 @@ export function NavRoutes({
         throw new Error(errorData.detail || 'An unknown error occurred.');
       }
 
-      const newIncident = await response.json();
-      console.log("Successfully created incident:", newIncident);
+      // Analysis runs as a background job, so poll until it finishes
+      let job = await response.json();
+      while (job.stage !== "done" && job.stage !== "failed") {
+        await new Promise((resolve) => setTimeout(resolve, 2000));
+        const jobResponse = await fetch(`http://127.0.0.1:8000/video/jobs/${job.job_id}`, {
+          headers: {
+            'Authorization': `Bearer ${token}`,
+          },
+        });
+        if (!jobResponse.ok) {
+          throw new Error('Lost track of the analysis job.');
+        }
+        job = await jobResponse.json();
+      }
+
+      if (job.stage === "failed") {
+        throw new Error(job.error || 'Analysis failed.');
+      }
+      console.log("Successfully created incident:", job.incident_id);
       
       setSelectedFile(null);
       setIsDialogOpen(false);
@@ -25,12 +25,19 @@ interface UserStats {
   resolved_incidents: number;
 }
 
+interface Achievement {
+  id: string;
+  achievement_name: string;
+  achieved_at: string;
+}
+
 // export const iframeHeight = "800px"
 
 // export const description = "A sidebar with a header and a search form."
 
 export default function DashboardPage() {
   const [userStats, setUserStats] = useState<UserStats | null>(null);
+  const [achievements, setAchievements] = useState<Achievement[]>([]);
   const [isLoading, setIsLoading] = useState(true);
   const navigate = useNavigate();
 
@@ -42,12 +49,14 @@ export default function DashboardPage() {
         return;
       }
       try {
-        const response = await fetch("http://127.0.0.1:8000/users/getUserInfo", {
+        // One request for the whole page; the backend fetches the sections concurrently
+        const response = await fetch("http://127.0.0.1:8000/dashboard", {
           headers: { Authorization: `Bearer ${token}` },
         });
-        if (!response.ok) throw new Error("Failed to fetch user data.");
+        if (!response.ok) throw new Error("Failed to fetch dashboard data.");
         const data = await response.json();
-        setUserStats(data);
+        setUserStats(data.profile);
+        setAchievements(data.recent_achievements);
       } catch (error) {
         console.error(error);
       } finally {
@@ -69,7 +78,7 @@ export default function DashboardPage() {
           <AppSidebar user={userStats}/>
           <MobileNav routes={mobileRoutes} />
           <SidebarInset>
-            <MainDashboard stats={userStats} className="min-h-[100vh] flex-1 rounded-xl max-sm:m-4 md:min-h-min m-12 lg:mx-22 mb-28 max-sm:pb-24 bg-white/30 dark:bg-darkBlue/50 dark:border-darkBlue/50 border-accent/40 border-1 backdrop-blur-3xl shadow-lg text-midBlue dark:text-lightPurple" />
+            <MainDashboard stats={userStats} achievements={achievements} className="min-h-[100vh] flex-1 rounded-xl max-sm:m-4 md:min-h-min m-12 lg:mx-22 mb-28 max-sm:pb-24 bg-white/30 dark:bg-darkBlue/50 dark:border-darkBlue/50 border-accent/40 border-1 backdrop-blur-3xl shadow-lg text-midBlue dark:text-lightPurple" />
           </SidebarInset>
         </div>
       </SidebarProvider>